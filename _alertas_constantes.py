@@ -0,0 +1,59 @@
+"""
+Umbrales y pesos del detector de alertas avanzadas
+Declarados como escalares NumPy (np.float64 / np.int32), los mismos tipos
+que usa el kernel de _alertas_numba, que los recibe como argumentos
+(UMBRALES_KERNEL / PESOS_KERNEL): un cambio aquí llega igual a la versión
+Numba y a la NumPy, sin recompilar ni borrar la caché.
+Autor: AIDA
+"""
+
+import numpy as np
+
+# === VOLATILIDAD ===
+ATR_PCT_ALTA = np.float64(5.0)           # ATR% > 5% indica alta volatilidad
+ATR_PCT_NORMAL = np.float64(3.0)         # Referencia de volatilidad normal
+AUMENTO_VOLATILIDAD_MIN = np.float64(25.0)
+AUMENTO_VOLATILIDAD_ALTA = np.float64(50.0)
+
+# === VOLUMEN ===
+RVOL_ALTO = np.float64(3.0)
+RVOL_BAJO = np.float64(0.4)
+
+# === PRECIO ===
+CAMBIO_PRECIO_ABRUPTO = np.float64(5.0)
+CAMBIO_PRECIO_ALTO = np.float64(10.0)
+CAMBIO_CORRELACION_MIN = np.float64(2.0)
+
+# Pares con correlación histórica positiva que se vigilan:
+# (activo A, activo B, prefijo de A, prefijo de B). Las métricas del evento
+# son '<prefijo>_cambio' (BTC/ETH conserva btc_cambio / eth_cambio)
+PARES_CORRELACIONADOS = (
+    ('BTC-USD', 'ETH-USD', 'btc', 'eth'),
+    ('BTC-USD', 'SOL-USD', 'btc', 'sol'),
+    ('^GSPC', '^IXIC', 'spx', 'ixic'),
+    ('^GSPC', '^DJI', 'spx', 'dji'),
+)
+
+# === RSI EXTREMO ===
+RSI_SOBRECOMPRA_EXTREMA = np.float64(75.0)
+RSI_SOBREVENTA_EXTREMA = np.float64(25.0)
+
+# === PATRONES CON PROBABILIDAD ===
+RSI_ALCISTA = np.float64(55.0)
+RSI_BAJISTA = np.float64(45.0)
+ADX_TENDENCIA = np.float64(25.0)
+RVOL_CONFIRMACION = np.float64(1.2)
+STOCH_ALCISTA = np.float64(60.0)
+STOCH_BAJISTA = np.float64(40.0)
+
+# Pesos en puntos porcentuales enteros: el score acumulado ya es la
+# probabilidad, sin redondeo en el umbral del 60%
+PESO_EMA = np.int32(20)
+PESO_RSI = np.int32(15)
+PESO_MACD = np.int32(25)
+PESO_ADX = np.int32(15)
+PESO_VOLUMEN = np.int32(15)
+PESO_STOCH = np.int32(10)
+
+PROBABILIDAD_MINIMA = 60
+PROBABILIDAD_ALTA = 75
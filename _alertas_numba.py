@@ -0,0 +1,146 @@
+"""
+Kernels compilados con Numba para el detector de alertas avanzadas
+Operan sobre los arrays de métricas (uno por métrica) que construye
+DetectorAlertasAvanzadas._construir_soa
+Autor: AIDA
+"""
+
+import numpy as np
+
+from _njit import njit, prange
+from _alertas_constantes import (
+    ATR_PCT_ALTA, ATR_PCT_NORMAL, AUMENTO_VOLATILIDAD_MIN, RVOL_ALTO, RVOL_BAJO,
+    CAMBIO_PRECIO_ABRUPTO, RSI_SOBRECOMPRA_EXTREMA, RSI_SOBREVENTA_EXTREMA,
+    RSI_ALCISTA, RSI_BAJISTA, ADX_TENDENCIA, RVOL_CONFIRMACION, STOCH_ALCISTA, STOCH_BAJISTA,
+    PESO_EMA, PESO_RSI, PESO_MACD, PESO_ADX, PESO_VOLUMEN, PESO_STOCH
+)
+
+# Umbrales y pesos llegan al kernel como argumentos y no como globales: la
+# caché de Numba (cache=True) no detecta cambios en módulos importados y
+# seguiría usando los valores con que se compiló, mientras la versión NumPy
+# ya usaría los nuevos. Posiciones en cada vector:
+(U_ATR_ALTA, U_ATR_NORMAL, U_AUMENTO_VOLATILIDAD, U_RVOL_ALTO, U_RVOL_BAJO,
+ U_CAMBIO_ABRUPTO, U_RSI_SOBRECOMPRA, U_RSI_SOBREVENTA, U_RSI_ALCISTA, U_RSI_BAJISTA,
+ U_ADX_TENDENCIA, U_RVOL_CONFIRMACION, U_STOCH_ALCISTA, U_STOCH_BAJISTA) = range(14)
+(P_EMA, P_RSI, P_MACD, P_ADX, P_VOLUMEN, P_STOCH) = range(6)
+
+UMBRALES_KERNEL = np.array([
+    ATR_PCT_ALTA, ATR_PCT_NORMAL, AUMENTO_VOLATILIDAD_MIN, RVOL_ALTO, RVOL_BAJO,
+    CAMBIO_PRECIO_ABRUPTO, RSI_SOBRECOMPRA_EXTREMA, RSI_SOBREVENTA_EXTREMA,
+    RSI_ALCISTA, RSI_BAJISTA, ADX_TENDENCIA, RVOL_CONFIRMACION, STOCH_ALCISTA, STOCH_BAJISTA
+], dtype=np.float64)
+PESOS_KERNEL = np.array([PESO_EMA, PESO_RSI, PESO_MACD, PESO_ADX, PESO_VOLUMEN, PESO_STOCH],
+                        dtype=np.int32)
+
+
+@njit(cache=True, parallel=True)
+def escanear_activos(atr_pct, rvol, con_volumen, rsi, cambio_pct, con_previo,
+                     ema_50, ema_200, macd_hist, adx, stoch_k, umbrales, pesos,
+                     out_volatilidad, out_volumen_alto, out_volumen_bajo,
+                     out_cambio_abrupto, out_sobrecompra, out_sobreventa,
+                     out_alcista, out_bajista, out_total):
+    """
+    Evalúa en una sola pasada todos los umbrales por activo: volatilidad,
+    volumen, cambio de precio, RSI extremo y scores de patrón.
+    
+    Cada métrica se lee una vez por activo. Las salidas son banderas por
+    activo (no índices compactados) para que el bucle siga siendo paralelo
+    sin contadores compartidos.
+    
+    Los scores se acumulan en puntos porcentuales enteros, de modo que el
+    score final es directamente la probabilidad.
+    
+    `umbrales` y `pesos` son UMBRALES_KERNEL y PESOS_KERNEL.
+    """
+    atr_alta = umbrales[U_ATR_ALTA]
+    atr_normal = umbrales[U_ATR_NORMAL]
+    aumento_volatilidad = umbrales[U_AUMENTO_VOLATILIDAD]
+    rvol_alto = umbrales[U_RVOL_ALTO]
+    rvol_bajo = umbrales[U_RVOL_BAJO]
+    cambio_abrupto = umbrales[U_CAMBIO_ABRUPTO]
+    rsi_sobrecompra = umbrales[U_RSI_SOBRECOMPRA]
+    rsi_sobreventa = umbrales[U_RSI_SOBREVENTA]
+    rsi_alcista = umbrales[U_RSI_ALCISTA]
+    rsi_bajista = umbrales[U_RSI_BAJISTA]
+    adx_tendencia = umbrales[U_ADX_TENDENCIA]
+    rvol_confirmacion = umbrales[U_RVOL_CONFIRMACION]
+    stoch_alcista = umbrales[U_STOCH_ALCISTA]
+    stoch_bajista = umbrales[U_STOCH_BAJISTA]
+    peso_ema = pesos[P_EMA]
+    peso_rsi = pesos[P_RSI]
+    peso_macd = pesos[P_MACD]
+    peso_adx = pesos[P_ADX]
+    peso_volumen = pesos[P_VOLUMEN]
+    peso_stoch = pesos[P_STOCH]
+    
+    n = ema_50.shape[0]
+    for i in prange(n):
+        e50 = ema_50[i]
+        e200 = ema_200[i]
+        alcista_ema = e50 > e200
+        rsi_i = rsi[i]
+        stoch = stoch_k[i]
+        rvol_i = rvol[i]
+        con_vol = con_volumen[i]
+        atr_i = atr_pct[i]
+        cambio = cambio_pct[i]
+        
+        # Anomalías y alertas de umbral simple
+        out_volatilidad[i] = (atr_i > atr_alta and
+                              (atr_i - atr_normal) / atr_normal * 100 > aumento_volatilidad)
+        out_volumen_alto[i] = con_vol and rvol_i > rvol_alto
+        out_volumen_bajo[i] = con_vol and rvol_i < rvol_bajo
+        out_cambio_abrupto[i] = con_previo[i] and abs(cambio) > cambio_abrupto
+        out_sobrecompra[i] = rsi_i > rsi_sobrecompra
+        out_sobreventa[i] = rsi_i < rsi_sobreventa
+        
+        alcista = np.int32(0)
+        bajista = np.int32(0)
+        total = 3  # RSI, MACD y Stochastic siempre cuentan
+        
+        # 1. EMAs (20%)
+        if e50 != 0 and e200 != 0:
+            total += 1
+            if alcista_ema:
+                alcista += peso_ema
+            else:
+                bajista += peso_ema
+        
+        # 2. RSI (15%)
+        if rsi_i > rsi_alcista:
+            alcista += peso_rsi
+        elif rsi_i < rsi_bajista:
+            bajista += peso_rsi
+        
+        # 3. MACD (25%)
+        if macd_hist[i] > 0:
+            alcista += peso_macd
+        else:
+            bajista += peso_macd
+        
+        # 4. ADX (15%)
+        if adx[i] > adx_tendencia:
+            total += 1
+            if alcista_ema:
+                alcista += peso_adx
+            elif e50 < e200:
+                bajista += peso_adx
+        
+        # 5. Volumen (15%)
+        if con_vol:
+            total += 1
+            if rvol_i > rvol_confirmacion:
+                if alcista > bajista:
+                    alcista += peso_volumen
+                else:
+                    bajista += peso_volumen
+        
+        # 6. Stochastic (10%)
+        if stoch > stoch_alcista:
+            alcista += peso_stoch
+        elif stoch < stoch_bajista:
+            bajista += peso_stoch
+        
+        out_alcista[i] = alcista
+        out_bajista[i] = bajista
+        out_total[i] = total
@@ -0,0 +1,29 @@
+"""
+Configuración de la consola compartida por los puntos de entrada del SVGA
+Autor: AIDA
+"""
+
+import sys
+
+
+def configurar_utf8():
+    """
+    Pone stdout y stderr en UTF-8 en Windows (compatibilidad con emojis)
+
+    Solo si la consola no está ya en UTF-8 (p. ej. PYTHONUTF8=1). reconfigure
+    cambia la codificación del propio TextIOWrapper sin envolverlo, así que
+    llamarla desde varios módulos es inocuo; codecs queda como respaldo para
+    streams sustituidos que no lo admiten. En otros sistemas no hace nada.
+    """
+    if sys.platform != 'win32':
+        return
+
+    for nombre in ('stdout', 'stderr'):
+        stream = getattr(sys, nombre)
+        if (getattr(stream, 'encoding', None) or '').lower() in ('utf-8', 'utf8'):
+            continue
+        if hasattr(stream, 'reconfigure'):
+            stream.reconfigure(encoding='utf-8', errors='strict')
+        elif hasattr(stream, 'buffer'):
+            import codecs
+            setattr(sys, nombre, codecs.getwriter('utf-8')(stream.buffer, 'strict'))
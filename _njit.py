@@ -0,0 +1,23 @@
+"""
+Shim opcional de Numba para los kernels numéricos del SVGA
+Si numba no está instalado, njit devuelve la función sin compilar y
+prange se comporta como range, de modo que los módulos siguen importando.
+Autor: AIDA
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Decorador identidad: admite @njit y @njit(...)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorador(func):
+            return func
+
+        return decorador
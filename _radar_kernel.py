@@ -0,0 +1,111 @@
+"""
+Kernel compilado con Numba para las métricas del radar de mercado
+Opera sobre matrices (tickers × barras) contiguas por ticker, de modo que
+cada hilo recorre la serie de un ticker sin saltos de memoria
+Autor: AIDA
+"""
+
+import numpy as np
+
+from _njit import njit, prange
+
+# Ventanas del radar (barras). Compartidas con la versión NumPy de market_radar
+VENTANA_SMA_CORTA = 20
+VENTANA_SMA_MEDIA = 50
+VENTANA_SMA_LARGA = 200
+VENTANA_EXTREMOS = 20
+VENTANA_ATR = 14
+VENTANA_VOLUMEN = 20
+
+# Barras que leen todas las ventanas juntas: la SMA larga y su valor previo.
+# Con esta cola los resultados son idénticos a usar la serie completa
+BARRAS_NECESARIAS = max(VENTANA_SMA_LARGA, VENTANA_EXTREMOS, VENTANA_ATR) + 1
+
+
+@njit(cache=True)
+def _medias_finales(x, ventana):
+    """
+    Media móvil de `ventana` barras en la última y penúltima barra
+    
+    Ambas ventanas comparten ventana - 1 barras: se suman una sola vez y a
+    cada media se le añade su barra extremo (suma incremental, ventana + 1
+    lecturas en vez de 2 × ventana). NaN si la ventana no cabe o contiene
+    NaN, como rolling().mean().
+    
+    Returns:
+        Tupla (media actual, media previa)
+    """
+    n = x.shape[0]
+    if n < ventana:
+        return np.nan, np.nan
+    comun = 0.0
+    for i in range(n - ventana, n - 1):
+        comun += x[i]
+    actual = (comun + x[n - 1]) / ventana
+    previa = (x[n - ventana - 1] + comun) / ventana if n > ventana else np.nan
+    return actual, previa
+
+
+@njit(cache=True)
+def _extremo_previo(x, ventana, maximo):
+    """
+    Máximo (o mínimo) de las `ventana` barras anteriores a la última;
+    NaN si alguna es NaN (como rolling().max().iloc[-2])
+    """
+    fin = x.shape[0] - 1
+    inicio = fin - ventana
+    if inicio < 0:
+        return np.nan
+    extremo = x[inicio]
+    for i in range(inicio, fin):
+        v = x[i]
+        if v != v:
+            return np.nan
+        if (maximo and v > extremo) or (not maximo and v < extremo):
+            extremo = v
+    return extremo
+
+
+@njit(cache=True)
+def _atr_final(high, low, close, ventana):
+    """
+    Media del True Range en las últimas `ventana` barras; cada TR es el
+    máximo ignorando NaN de |H-L|, |H-Cprev| y |L-Cprev|
+    """
+    n = close.shape[0]
+    if n < ventana:
+        return np.nan
+    suma = 0.0
+    for i in range(n - ventana, n):
+        tr = high[i] - low[i]
+        if i > 0:
+            hc = abs(high[i] - close[i - 1])
+            lc = abs(low[i] - close[i - 1])
+            if hc > tr or tr != tr:
+                tr = hc
+            if lc > tr or tr != tr:
+                tr = lc
+        suma += tr
+    return suma / ventana
+
+
+@njit(cache=True, parallel=True)
+def ventanas_radar(close, high, low, volume,
+                   out_sma_20, out_sma_50, out_sma_50_prev, out_sma_200, out_sma_200_prev,
+                   out_high_20, out_low_20, out_atr_14, out_avg_volume_20):
+    """
+    Calcula en una sola pasada por ticker todas las ventanas móviles que
+    usa el radar, leyendo solo la cola de cada serie.
+
+    Sin fastmath: las ventanas incompletas dependen de la propagación de NaN.
+    """
+    n_tickers = close.shape[0]
+    for j in prange(n_tickers):
+        c = close[j]
+        out_sma_20[j] = _medias_finales(c, VENTANA_SMA_CORTA)[0]
+        out_sma_50[j], out_sma_50_prev[j] = _medias_finales(c, VENTANA_SMA_MEDIA)
+        out_sma_200[j], out_sma_200_prev[j] = _medias_finales(c, VENTANA_SMA_LARGA)
+        out_high_20[j] = _extremo_previo(high[j], VENTANA_EXTREMOS, True)
+        out_low_20[j] = _extremo_previo(low[j], VENTANA_EXTREMOS, False)
+        out_atr_14[j] = _atr_final(high[j], low[j], c, VENTANA_ATR)
+        out_avg_volume_20[j] = _medias_finales(volume[j], VENTANA_VOLUMEN)[0]
@@ -8,8 +8,192 @@ Fecha: 25 de octubre de 2025
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import chain
+
+from _njit import NUMBA_AVAILABLE
+from _alertas_numba import escanear_activos, UMBRALES_KERNEL, PESOS_KERNEL
+from _alertas_constantes import (
+    ATR_PCT_ALTA, ATR_PCT_NORMAL, AUMENTO_VOLATILIDAD_MIN, AUMENTO_VOLATILIDAD_ALTA,
+    RVOL_ALTO, RVOL_BAJO, CAMBIO_PRECIO_ABRUPTO, CAMBIO_PRECIO_ALTO, CAMBIO_CORRELACION_MIN,
+    RSI_SOBRECOMPRA_EXTREMA, RSI_SOBREVENTA_EXTREMA, RSI_ALCISTA, RSI_BAJISTA,
+    ADX_TENDENCIA, RVOL_CONFIRMACION, STOCH_ALCISTA, STOCH_BAJISTA,
+    PESO_EMA, PESO_RSI, PESO_MACD, PESO_ADX, PESO_VOLUMEN, PESO_STOCH,
+    PROBABILIDAD_MINIMA, PROBABILIDAD_ALTA, PARES_CORRELACIONADOS
+)
+
+
+# Métricas materializadas como arrays y su valor por defecto si faltan
+METRICAS_SOA = {
+    'atr': 0.0,
+    'atr_percent': 0.0,
+    'rsi': 50.0,
+    'volume': 0.0,
+    'volume_sma_20': 0.0,
+    'close': 0.0,
+    'close_prev': 0.0,
+    'ema_50': 0.0,
+    'ema_200': 0.0,
+    'macd_histogram': 0.0,
+    'adx': 0.0,
+    'stoch_k': 50.0,
+}
+
+# Textos por plantilla de evento: (titulo, descripcion, {métrica: (spec, sufijo)})
+# Los detectores guardan valores numéricos; los textos se generan al final
+# en _materializar_descripciones, solo para los eventos detectados. Cada
+# métrica de texto es format(valor, spec) + sufijo: una llamada en C, sin
+# interpretar una plantilla str.format por valor.
+PLANTILLAS_EVENTO = {
+    'VOLATILIDAD_AUMENTADA': (
+        "⚠️ Anomalía Detectada",
+        "Volatilidad de '{ticker}' aumentó un {aumento_estimado:.0f}% inesperadamente en últimas 24h.",
+        {'aumento_estimado': (".1f", "%")}
+    ),
+    'VOLUMEN_ALTO': (
+        "💡 Alerta",
+        "El volumen de negociación de '{ticker}' es inusualmente ALTO hoy ({rvol:.1f}x promedio).",
+        {'rvol': (".2f", "x")}
+    ),
+    'VOLUMEN_BAJO': (
+        "💡 Alerta",
+        "El volumen de negociación de '{ticker}' es inusualmente BAJO hoy ({rvol:.1f}x promedio).",
+        {'rvol': (".2f", "x")}
+    ),
+    'PATRON_ALCISTA': (
+        "💡 Oportunidad Potencial",
+        "Patrón alcista identificado en '{ticker}' con probabilidad del {probabilidad}%.",
+        {'probabilidad': ("", "%")}
+    ),
+    'PATRON_BAJISTA': (
+        "⚠️ Oportunidad Potencial (Venta)",
+        "Patrón bajista identificado en '{ticker}' con probabilidad del {probabilidad}%.",
+        {'probabilidad': ("", "%")}
+    ),
+    'DIVERGENCIA_ALCISTA': (
+        "💡 Oportunidad: Divergencia Alcista",
+        "Se detectó una divergencia alcista en el {indicador} para '{ticker}'.",
+        {}
+    ),
+    'DIVERGENCIA_BAJISTA': (
+        "💡 Oportunidad: Divergencia Bajista",
+        "Se detectó una divergencia bajista en el {indicador} para '{ticker}'.",
+        {}
+    ),
+    'CAMBIO_PRECIO_ABRUPTO': (
+        "⚠️ Anomalía Detectada",
+        "Cambio de precio abrupto en '{ticker}': {cambio_porcentaje:+.2f}% en última sesión.",
+        {'cambio_porcentaje': ("+.2f", "%")}
+    ),
+    'RSI_SOBRECOMPRA': (
+        "💡 Alerta",
+        "'{ticker}' en zona de sobrecompra extrema (RSI: {rsi:.1f}). Posible corrección.",
+        {}
+    ),
+    'RSI_SOBREVENTA': (
+        "💡 Alerta",
+        "'{ticker}' en zona de sobreventa extrema (RSI: {rsi:.1f}). Posible rebote.",
+        {}
+    ),
+}
+
+# Una plantilla de correlación rota por par vigilado ('CORRELACION_ROTA A/B'):
+# cada par publica sus propias claves de métrica
+PLANTILLAS_EVENTO.update({
+    f"CORRELACION_ROTA {activo_a}/{activo_b}": (
+        "⚠️ Anomalía: Correlación Rota",
+        f"La correlación histórica entre '{activo_a}' y '{activo_b}' se ha desviado significativamente. "
+        f"{prefijo_a.upper()} {{{prefijo_a}_cambio:+.2f}}% vs {prefijo_b.upper()} {{{prefijo_b}_cambio:+.2f}}%.",
+        {f"{prefijo_a}_cambio": ("+.2f", "%"), f"{prefijo_b}_cambio": ("+.2f", "%")}
+    )
+    for activo_a, activo_b, prefijo_a, prefijo_b in PARES_CORRELACIONADOS
+})
+
+# Métricas principales de cada plantilla -> campos metrica_a / metrica_b de
+# DTYPE_EVENTO (None: el campo queda en NaN)
+METRICAS_PRINCIPALES = {
+    'VOLATILIDAD_AUMENTADA': ('aumento_estimado', 'atr_percent'),
+    'VOLUMEN_ALTO': ('rvol', 'volumen_actual'),
+    'VOLUMEN_BAJO': ('rvol', 'volumen_actual'),
+    'PATRON_ALCISTA': ('probabilidad', 'indicadores_convergentes'),
+    'PATRON_BAJISTA': ('probabilidad', 'indicadores_convergentes'),
+    'DIVERGENCIA_ALCISTA': (None, None),
+    'DIVERGENCIA_BAJISTA': (None, None),
+    'CAMBIO_PRECIO_ABRUPTO': ('cambio_porcentaje', 'precio_actual'),
+    'RSI_SOBRECOMPRA': ('rsi', 'umbral'),
+    'RSI_SOBREVENTA': ('rsi', 'umbral'),
+}
+METRICAS_PRINCIPALES.update({
+    f"CORRELACION_ROTA {activo_a}/{activo_b}": (f"{prefijo_a}_cambio", f"{prefijo_b}_cambio")
+    for activo_a, activo_b, prefijo_a, prefijo_b in PARES_CORRELACIONADOS
+})
+
+# Tipos de alerta de divergencia -> (es_alcista, indicador)
+# SVGASystem.generate_signals emite DIVERGENCIA_ALCISTA/BAJISTA desde el RSI
+TIPOS_DIVERGENCIA = {
+    'DIVERGENCIA_ALCISTA': (True, 'RSI'),
+    'DIVERGENCIA_BAJISTA': (False, 'RSI'),
+    'DIVERGENCIA_ALCISTA_RSI': (True, 'RSI'),
+    'DIVERGENCIA_BAJISTA_RSI': (False, 'RSI'),
+    'DIVERGENCIA_ALCISTA_MACD': (True, 'MACD'),
+    'DIVERGENCIA_BAJISTA_MACD': (False, 'MACD'),
+}
+
+# Registro tabular de un evento para consumidores por lotes (ver como_arrays)
+DTYPE_EVENTO = np.dtype([
+    ('tipo', 'U32'),
+    ('ticker', 'U48'),
+    ('severidad', 'U8'),
+    ('metrica_a', 'f8'),
+    ('metrica_b', 'f8'),
+])
+
+
+@dataclass
+class Alerta:
+    """
+    Evento detectado (anomalía, alerta u oportunidad)
+    
+    Usa __slots__ explícitos (compatible con Python 3.8) en lugar de un
+    dict por evento; se convierte a dict solo al publicar los resultados.
+    """
+    __slots__ = ('tipo', 'ticker', 'titulo', 'descripcion', 'severidad', 'metricas',
+                 'plantilla', 'contexto', 'valores')
+    
+    tipo: str
+    ticker: str
+    titulo: Optional[str]
+    descripcion: Optional[str]
+    severidad: str
+    metricas: Dict
+    plantilla: str
+    contexto: Dict
+    valores: Tuple[float, float]  # Métricas principales numéricas (como_arrays)
+    
+    def to_dict(self) -> Dict:
+        """Formato de salida original (sin los campos internos de plantilla)"""
+        return {
+            'tipo': self.tipo,
+            'ticker': self.ticker,
+            'titulo': self.titulo,
+            'descripcion': self.descripcion,
+            'severidad': self.severidad,
+            'metricas': self.metricas
+        }
+
+
+def _dividir(numerador: np.ndarray, denominador: np.ndarray, validos: np.ndarray) -> np.ndarray:
+    """
+    División elemento a elemento sin ramas por activo
+    
+    Solo divide donde `validos` es True; el resto queda en 0.
+    """
+    resultado = np.zeros(numerador.shape, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(numerador, denominador, out=resultado, where=validos)
+    return resultado
 
 
 class DetectorAlertasAvanzadas:
@@ -21,6 +205,7 @@ class DetectorAlertasAvanzadas:
         self.alertas_detectadas = []
         self.anomalias = []
         self.oportunidades = []
+        self._divergencias = []
     
     def detectar_todas_alertas(self, datos_completos: Dict) -> Dict:
         """
@@ -43,317 +228,476 @@ class DetectorAlertasAvanzadas:
         if 'crypto' in datos_completos and 'assets' in datos_completos['crypto']:
             todos_activos.update(datos_completos['crypto']['assets'])
         
-        # Detectar para cada activo
-        for ticker, data in todos_activos.items():
-            if 'latest_metrics' not in data or 'signals' not in data:
-                continue
-            
-            metrics = data['latest_metrics']
-            signals = data['signals']
-            
-            # 1. Anomalía: Volatilidad aumentada
-            self._detectar_volatilidad_anormal(ticker, metrics)
-            
-            # 2. Anomalía: Volumen inusual (alto o bajo)
-            self._detectar_volumen_inusual(ticker, metrics)
-            
-            # 3. Oportunidad: Patrones alcistas/bajistas con probabilidad
-            self._detectar_patrones_con_probabilidad(ticker, metrics, signals)
-            
-            # 4. Oportunidad: Divergencias RSI/MACD
-            self._detectar_divergencias(ticker, signals)
-            
-            # 5. Anomalía: Cambios abruptos de precio
-            self._detectar_cambios_abruptos_precio(ticker, metrics)
-            
-            # 6. Alerta: RSI extremo
-            self._detectar_rsi_extremo(ticker, metrics)
+        # Solo activos con métricas y señales completas
+        validos = [(ticker, data) for ticker, data in todos_activos.items()
+                   if 'latest_metrics' in data and 'signals' in data]
+        
+        # Materializar métricas como arrays (una columna por métrica)
+        tickers, soa = self._construir_soa(validos)
+        
+        # Evaluar todos los umbrales por activo en una sola pasada
+        umbrales = self._evaluar_umbrales(soa)
+        
+        # 1. Anomalía: Volatilidad aumentada
+        self._detectar_volatilidad_anormal(tickers, soa, umbrales)
+        
+        # 2. Anomalía: Volumen inusual (alto o bajo)
+        self._detectar_volumen_inusual(tickers, soa, umbrales)
+        
+        # 3. Oportunidad: Patrones alcistas/bajistas con probabilidad
+        senales = [data['signals'] for _, data in validos]
+        self._detectar_patrones_con_probabilidad(tickers, umbrales, senales)
+        
+        # 4. Oportunidad: Divergencias RSI/MACD
+        self._divergencias = self._indexar_divergencias(validos)
+        self._detectar_divergencias(self._divergencias)
+        
+        # 5. Anomalía: Cambios abruptos de precio
+        self._detectar_cambios_abruptos_precio(tickers, soa, umbrales)
+        
+        # 6. Alerta: RSI extremo
+        self._detectar_rsi_extremo(tickers, soa, umbrales)
         
         # Detectar correlaciones rotas entre activos
-        self._detectar_correlaciones_rotas(todos_activos)
+        self._detectar_correlaciones_rotas(tickers, soa)
+        
+        # Los detectores emiten agrupado por detector: se restaura el orden
+        # por activo (orden estable; los pares de correlación quedan al final)
+        self._ordenar_por_activo([ticker for ticker, _ in validos])
+        
+        # Generar textos solo para los eventos detectados
+        self._materializar_descripciones()
         
         return {
-            'anomalias': self.anomalias,
-            'oportunidades': self.oportunidades,
-            'alertas': self.alertas_detectadas
+            'anomalias': [evento.to_dict() for evento in self.anomalias],
+            'oportunidades': [evento.to_dict() for evento in self.oportunidades],
+            'alertas': [evento.to_dict() for evento in self.alertas_detectadas]
         }
     
-    def _detectar_volatilidad_anormal(self, ticker: str, metrics: Dict):
+    def _ordenar_por_activo(self, orden_tickers: List[str]):
+        """
+        Ordena cada lista de eventos por la posición de su activo
+        
+        sort es estable: los eventos de un mismo activo conservan el orden de
+        los detectores. Los tickers que no son activos (pares de correlación)
+        van detrás de todos.
+        """
+        posicion = {ticker: i for i, ticker in enumerate(orden_tickers)}
+        fin = len(posicion)
+        for eventos in (self.anomalias, self.oportunidades, self.alertas_detectadas):
+            eventos.sort(key=lambda evento: posicion.get(evento.ticker, fin))
+    
+    def como_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Devuelve los eventos de la última ejecución como arrays estructurados
+        (DTYPE_EVENTO), para filtrar o agregar por lotes sin recorrer dicts
+        
+        Ejemplo: arrays['anomalias'][arrays['anomalias']['severidad'] == 'ALTA']
+        
+        metrica_a / metrica_b son las métricas principales del evento
+        (METRICAS_PRINCIPALES), en NaN si el evento no las tiene.
+        
+        Returns:
+            Dict con las mismas claves que detectar_todas_alertas
+        """
+        def _a_array(eventos: List[Alerta]) -> np.ndarray:
+            return np.fromiter(
+                ((e.tipo, e.ticker, e.severidad, *e.valores) for e in eventos),
+                dtype=DTYPE_EVENTO, count=len(eventos)
+            )
+        
+        return {
+            'anomalias': _a_array(self.anomalias),
+            'oportunidades': _a_array(self.oportunidades),
+            'alertas': _a_array(self.alertas_detectadas)
+        }
+    
+    def _evento(self, tipo: str, ticker: str, severidad: str, metricas: Dict,
+                plantilla: Optional[str] = None, **contexto) -> Alerta:
+        """
+        Crea un evento con valores numéricos y sin textos formateados
+        
+        Args:
+            tipo: Tipo de evento publicado
+            ticker: Activo (o par de activos) afectado
+            severidad: ALTA / MEDIA / BAJA
+            metricas: Valores numéricos del evento
+            plantilla: Clave en PLANTILLAS_EVENTO (por defecto, el tipo)
+            **contexto: Valores extra usados solo en los textos
+        """
+        plantilla = plantilla or tipo
+        valores = tuple(float(metricas[clave]) if clave is not None else np.nan
+                        for clave in METRICAS_PRINCIPALES[plantilla])
+        return Alerta(
+            tipo=tipo,
+            ticker=ticker,
+            titulo=None,
+            descripcion=None,
+            severidad=severidad,
+            metricas=metricas,
+            plantilla=plantilla,
+            contexto=contexto,
+            valores=valores
+        )
+    
+    def _materializar_descripciones(self):
+        """
+        Genera título, descripción y métricas de texto de cada evento detectado
+        a partir de PLANTILLAS_EVENTO, en una única pasada al final
+        """
+        for evento in chain(self.anomalias, self.alertas_detectadas, self.oportunidades):
+            titulo, descripcion, formatos = PLANTILLAS_EVENTO[evento.plantilla]
+            metricas = evento.metricas
+            valores = {**metricas, **evento.contexto, 'ticker': evento.ticker}
+            
+            evento.titulo = titulo.format(**valores)
+            evento.descripcion = descripcion.format(**valores)
+            for clave, (spec, sufijo) in formatos.items():
+                metricas[clave] = format(metricas[clave], spec) + sufijo
+    
+    def _construir_soa(self, validos: List[Tuple[str, Dict]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Convierte las métricas por activo en un array por métrica (SoA)
+        
+        Además precalcula las máscaras de validez que comparten los detectores
+        (precio previo, volumen promedio y EMAs disponibles), para que cada
+        detector descarte de entrada los activos con métricas incompletas,
+        y las métricas derivadas que usan varios detectores (rvol, cambio %).
+        
+        Returns:
+            Tupla (tickers, {métrica o máscara: array de longitud N})
+        """
+        tickers = np.array([ticker for ticker, _ in validos], dtype=object)
+        metricas = [data['latest_metrics'] for _, data in validos]
+        
+        # Tabla columnar única (una fila contigua por métrica); cada entrada
+        # del dict es una vista sobre su fila
+        tabla = np.empty((len(METRICAS_SOA), len(validos)), dtype=np.float64)
+        for fila, (clave, defecto) in zip(tabla, METRICAS_SOA.items()):
+            fila[:] = [m.get(clave, defecto) for m in metricas]
+        soa = dict(zip(METRICAS_SOA, tabla))
+        
+        soa['con_precio_previo'] = soa['close_prev'] > 0
+        soa['con_volumen_promedio'] = soa['volume_sma_20'] > 0
+        soa['con_emas'] = (soa['ema_50'] != 0) & (soa['ema_200'] != 0)
+        soa['rvol'] = _dividir(soa['volume'], soa['volume_sma_20'], soa['con_volumen_promedio'])
+        soa['cambio_pct'] = _dividir(soa['close'] - soa['close_prev'], soa['close_prev'],
+                                     soa['con_precio_previo']) * 100
+        return tickers, soa
+    
+    def _detectar_volatilidad_anormal(self, tickers: np.ndarray, soa: Dict[str, np.ndarray],
+                                      umbrales: Dict[str, np.ndarray]):
         """
         Detecta aumento inusual de volatilidad
         Similar a: "Volatilidad de 'AAPL' aumentó 35% inesperadamente"
         """
-        atr = metrics.get('atr', 0)
-        atr_percent = metrics.get('atr_percent', 0)
+        idx = np.flatnonzero(umbrales['volatilidad'])
+        atr = soa['atr'][idx]
+        atr_percent = soa['atr_percent'][idx]
         
-        # Calcular ATR histórico promedio (aproximación)
-        if atr_percent > 5.0:  # ATR% > 5% indica alta volatilidad
-            # Estimar aumento (comparando con umbral normal de 3%)
-            aumento_pct = ((atr_percent - 3.0) / 3.0) * 100
-            
-            if aumento_pct > 25:  # Aumento > 25%
-                self.anomalias.append({
-                    'tipo': 'VOLATILIDAD_AUMENTADA',
-                    'ticker': ticker,
-                    'titulo': f"⚠️ Anomalía Detectada",
-                    'descripcion': f"Volatilidad de '{ticker}' aumentó un {aumento_pct:.0f}% inesperadamente en últimas 24h.",
-                    'severidad': 'ALTA' if aumento_pct > 50 else 'MEDIA',
-                    'metricas': {
-                        'atr_actual': atr,
-                        'atr_percent': atr_percent,
-                        'aumento_estimado': f"{aumento_pct:.1f}%"
-                    }
-                })
+        # Estimar aumento (comparando con umbral normal de 3%)
+        aumento_pct = ((atr_percent - ATR_PCT_NORMAL) / ATR_PCT_NORMAL) * 100
+        
+        self.anomalias.extend([
+            self._evento(
+                'VOLATILIDAD_AUMENTADA', ticker,
+                'ALTA' if aumento > AUMENTO_VOLATILIDAD_ALTA else 'MEDIA',
+                {
+                    'atr_actual': atr_i,
+                    'atr_percent': atr_pct_i,
+                    'aumento_estimado': aumento
+                }
+            )
+            for ticker, atr_i, atr_pct_i, aumento in zip(
+                tickers[idx].tolist(), atr.tolist(),
+                atr_percent.tolist(), aumento_pct.tolist()
+            )
+        ])
     
-    def _detectar_volumen_inusual(self, ticker: str, metrics: Dict):
+    def _detectar_volumen_inusual(self, tickers: np.ndarray, soa: Dict[str, np.ndarray],
+                                  umbrales: Dict[str, np.ndarray]):
         """
         Detecta volumen inusualmente alto o bajo
         Similar a: "El volumen de negociación de 'GOOGL' es inusualmente bajo hoy"
         """
-        volume = metrics.get('volume', 0)
-        volume_sma_20 = metrics.get('volume_sma_20', 0)
+        volume = soa['volume']
+        volume_sma_20 = soa['volume_sma_20']
+        rvol = soa['rvol']
         
-        if volume_sma_20 > 0:
-            rvol = volume / volume_sma_20
-            
-            # Volumen MUY alto (>3x)
-            if rvol > 3.0:
-                self.alertas_detectadas.append({
-                    'tipo': 'VOLUMEN_ALTO',
-                    'ticker': ticker,
-                    'titulo': f"💡 Alerta",
-                    'descripcion': f"El volumen de negociación de '{ticker}' es inusualmente ALTO hoy ({rvol:.1f}x promedio).",
-                    'severidad': 'MEDIA',
-                    'metricas': {
-                        'rvol': f"{rvol:.2f}x",
-                        'volumen_actual': volume,
-                        'volumen_promedio': volume_sma_20
-                    }
-                })
-            
-            # Volumen MUY bajo (<0.4x)
-            elif rvol < 0.4:
-                self.alertas_detectadas.append({
-                    'tipo': 'VOLUMEN_BAJO',
-                    'ticker': ticker,
-                    'titulo': f"💡 Alerta",
-                    'descripcion': f"El volumen de negociación de '{ticker}' es inusualmente BAJO hoy ({rvol:.1f}x promedio).",
-                    'severidad': 'BAJA',
-                    'metricas': {
-                        'rvol': f"{rvol:.2f}x",
-                        'volumen_actual': volume,
-                        'volumen_promedio': volume_sma_20
-                    }
-                })
+        # Volumen MUY alto (>3x) o MUY bajo (<0.4x)
+        alto = umbrales['volumen_alto']
+        bajo = umbrales['volumen_bajo']
+        
+        idx = np.flatnonzero(alto | bajo)
+        self.alertas_detectadas.extend([
+            self._evento(
+                'VOLUMEN_ALTO' if es_alto else 'VOLUMEN_BAJO', ticker,
+                'MEDIA' if es_alto else 'BAJA',
+                {
+                    'rvol': rvol_i,
+                    'volumen_actual': volumen,
+                    'volumen_promedio': promedio
+                }
+            )
+            for ticker, es_alto, rvol_i, volumen, promedio in zip(
+                tickers[idx].tolist(), alto[idx].tolist(), rvol[idx].tolist(),
+                volume[idx].tolist(), volume_sma_20[idx].tolist()
+            )
+        ])
     
-    def _detectar_patrones_con_probabilidad(self, ticker: str, metrics: Dict, signals: Dict):
+    def _evaluar_umbrales(self, soa: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """
-        Detecta patrones alcistas/bajistas y calcula probabilidad
-        Similar a: "Patrón alcista identificado en 'MSFT' con probabilidad del 70%"
+        Evalúa todos los umbrales por activo leyendo cada métrica una sola vez
+        
+        Usa el kernel Numba fusionado si está disponible; si no, la versión
+        NumPy. Los scores se acumulan en puntos porcentuales enteros (int32).
+        
+        Returns:
+            Dict con una bandera por activo para cada detector de umbral y los
+            arrays score_alcista, score_bajista y total_indicadores
         """
-        # Calcular probabilidad basada en convergencia de indicadores
-        score_alcista = 0
-        score_bajista = 0
-        total_indicadores = 0
+        if NUMBA_AVAILABLE:
+            n = len(soa['rsi'])
+            umbrales = {nombre: np.empty(n, dtype=np.bool_) for nombre in (
+                'volatilidad', 'volumen_alto', 'volumen_bajo',
+                'cambio_abrupto', 'sobrecompra', 'sobreventa'
+            )}
+            umbrales['score_alcista'] = np.empty(n, dtype=np.int32)
+            umbrales['score_bajista'] = np.empty(n, dtype=np.int32)
+            umbrales['total_indicadores'] = np.empty(n, dtype=np.int64)
+            escanear_activos(soa['atr_percent'], soa['rvol'], soa['con_volumen_promedio'], soa['rsi'],
+                             soa['cambio_pct'], soa['con_precio_previo'], soa['ema_50'], soa['ema_200'],
+                             soa['macd_histogram'], soa['adx'], soa['stoch_k'],
+                             UMBRALES_KERNEL, PESOS_KERNEL,
+                             umbrales['volatilidad'], umbrales['volumen_alto'], umbrales['volumen_bajo'],
+                             umbrales['cambio_abrupto'], umbrales['sobrecompra'], umbrales['sobreventa'],
+                             umbrales['score_alcista'], umbrales['score_bajista'],
+                             umbrales['total_indicadores'])
+            return umbrales
+        
+        atr_percent = soa['atr_percent']
+        cambio_pct = soa['cambio_pct']
+        ema_50 = soa['ema_50']
+        ema_200 = soa['ema_200']
+        rsi = soa['rsi']
+        macd_hist = soa['macd_histogram']
+        adx = soa['adx']
+        stoch_k = soa['stoch_k']
+        
+        con_emas = soa['con_emas']
+        alcista_ema = ema_50 > ema_200
+        bajista_ema = ema_50 < ema_200
+        macd_positivo = macd_hist > 0
+        tendencia = adx > ADX_TENDENCIA
+        con_volumen = soa['con_volumen_promedio']
+        rvol = soa['rvol']
         
         # 1. EMAs (20%)
-        ema_50 = metrics.get('ema_50', 0)
-        ema_200 = metrics.get('ema_200', 0)
-        if ema_50 and ema_200:
-            total_indicadores += 1
-            if ema_50 > ema_200:
-                score_alcista += 0.20
-            else:
-                score_bajista += 0.20
+        cero = np.int32(0)
+        score_alcista = np.where(con_emas & alcista_ema, PESO_EMA, cero)
+        score_bajista = np.where(con_emas & ~alcista_ema, PESO_EMA, cero)
         
         # 2. RSI (15%)
-        rsi = metrics.get('rsi', 50)
-        total_indicadores += 1
-        if rsi > 55:
-            score_alcista += 0.15
-        elif rsi < 45:
-            score_bajista += 0.15
+        score_alcista = score_alcista + np.where(rsi > RSI_ALCISTA, PESO_RSI, cero)
+        score_bajista = score_bajista + np.where(rsi < RSI_BAJISTA, PESO_RSI, cero)
         
         # 3. MACD (25%)
-        macd_hist = metrics.get('macd_histogram', 0)
-        total_indicadores += 1
-        if macd_hist > 0:
-            score_alcista += 0.25
-        else:
-            score_bajista += 0.25
+        score_alcista = score_alcista + np.where(macd_positivo, PESO_MACD, cero)
+        score_bajista = score_bajista + np.where(macd_positivo, cero, PESO_MACD)
         
         # 4. ADX (15%)
-        adx = metrics.get('adx', 0)
-        if adx > 25:
-            total_indicadores += 1
-            score_alcista += 0.15 if ema_50 > ema_200 else 0
-            score_bajista += 0.15 if ema_50 < ema_200 else 0
-        
-        # 5. Volumen (15%)
-        volume = metrics.get('volume', 0)
-        volume_sma = metrics.get('volume_sma_20', 0)
-        if volume_sma > 0:
-            rvol = volume / volume_sma
-            total_indicadores += 1
-            if rvol > 1.2:
-                if score_alcista > score_bajista:
-                    score_alcista += 0.15
-                else:
-                    score_bajista += 0.15
+        score_alcista = score_alcista + np.where(tendencia & alcista_ema, PESO_ADX, cero)
+        score_bajista = score_bajista + np.where(tendencia & bajista_ema, PESO_ADX, cero)
+        
+        # 5. Volumen (15%) - refuerza el lado dominante hasta aquí
+        volumen_alto = con_volumen & (rvol > RVOL_CONFIRMACION)
+        domina_alcista = score_alcista > score_bajista
+        score_alcista = score_alcista + np.where(volumen_alto & domina_alcista, PESO_VOLUMEN, cero)
+        score_bajista = score_bajista + np.where(volumen_alto & ~domina_alcista, PESO_VOLUMEN, cero)
         
         # 6. Stochastic (10%)
-        stoch_k = metrics.get('stoch_k', 50)
-        total_indicadores += 1
-        if stoch_k > 60:
-            score_alcista += 0.10
-        elif stoch_k < 40:
-            score_bajista += 0.10
+        score_alcista = score_alcista + np.where(stoch_k > STOCH_ALCISTA, PESO_STOCH, cero)
+        score_bajista = score_bajista + np.where(stoch_k < STOCH_BAJISTA, PESO_STOCH, cero)
         
-        # Convertir a porcentaje
-        prob_alcista = int(score_alcista * 100)
-        prob_bajista = int(score_bajista * 100)
+        # RSI, MACD y Stochastic siempre cuentan; EMAs, ADX y volumen si aplican
+        total_indicadores = 3 + con_emas.astype(np.int64) + tendencia + con_volumen
+        
+        # Umbrales simples: ATR% > 5% con aumento > 25%, RVOL > 3x o < 0.4x,
+        # cambio de precio > 5% y RSI fuera de 25-75
+        aumento_pct = ((atr_percent - ATR_PCT_NORMAL) / ATR_PCT_NORMAL) * 100
+        
+        return {
+            'volatilidad': (atr_percent > ATR_PCT_ALTA) & (aumento_pct > AUMENTO_VOLATILIDAD_MIN),
+            'volumen_alto': con_volumen & (rvol > RVOL_ALTO),
+            'volumen_bajo': con_volumen & (rvol < RVOL_BAJO),
+            'cambio_abrupto': soa['con_precio_previo'] & (np.abs(cambio_pct) > CAMBIO_PRECIO_ABRUPTO),
+            'sobrecompra': rsi > RSI_SOBRECOMPRA_EXTREMA,
+            'sobreventa': rsi < RSI_SOBREVENTA_EXTREMA,
+            'score_alcista': score_alcista,
+            'score_bajista': score_bajista,
+            'total_indicadores': total_indicadores
+        }
+    
+    def _detectar_patrones_con_probabilidad(self, tickers: np.ndarray, umbrales: Dict[str, np.ndarray],
+                                            senales: List[Dict]):
+        """
+        Detecta patrones alcistas/bajistas y calcula probabilidad
+        Similar a: "Patrón alcista identificado en 'MSFT' con probabilidad del 70%"
+        """
+        # Los scores ya están en puntos porcentuales
+        prob_alcista = umbrales['score_alcista']
+        prob_bajista = umbrales['score_bajista']
+        total_indicadores = umbrales['total_indicadores']
         
         # Generar alerta si probabilidad > 60%
-        if prob_alcista >= 60:
-            self.oportunidades.append({
-                'tipo': 'PATRON_ALCISTA',
-                'ticker': ticker,
-                'titulo': f"💡 Oportunidad Potencial",
-                'descripcion': f"Patrón alcista identificado en '{ticker}' con probabilidad del {prob_alcista}%.",
-                'severidad': 'ALTA' if prob_alcista >= 75 else 'MEDIA',
-                'metricas': {
-                    'probabilidad': f"{prob_alcista}%",
-                    'indicadores_convergentes': total_indicadores,
-                    'recomendacion': signals.get('recommendation', 'MANTENER')
-                }
-            })
-        
-        elif prob_bajista >= 60:
-            self.oportunidades.append({
-                'tipo': 'PATRON_BAJISTA',
-                'ticker': ticker,
-                'titulo': f"⚠️ Oportunidad Potencial (Venta)",
-                'descripcion': f"Patrón bajista identificado en '{ticker}' con probabilidad del {prob_bajista}%.",
-                'severidad': 'ALTA' if prob_bajista >= 75 else 'MEDIA',
-                'metricas': {
-                    'probabilidad': f"{prob_bajista}%",
-                    'indicadores_convergentes': total_indicadores,
-                    'recomendacion': signals.get('recommendation', 'MANTENER')
+        es_alcista = prob_alcista >= PROBABILIDAD_MINIMA
+        es_bajista = ~es_alcista & (prob_bajista >= PROBABILIDAD_MINIMA)
+        
+        idx = np.flatnonzero(es_alcista | es_bajista)
+        prob = np.where(es_alcista, prob_alcista, prob_bajista)
+        self.oportunidades.extend([
+            self._evento(
+                'PATRON_ALCISTA' if alcista else 'PATRON_BAJISTA', ticker,
+                'ALTA' if prob_i >= PROBABILIDAD_ALTA else 'MEDIA',
+                {
+                    'probabilidad': prob_i,
+                    'indicadores_convergentes': total,
+                    'recomendacion': senales[i].get('recommendation', 'MANTENER')
                 }
-            })
+            )
+            for i, ticker, alcista, prob_i, total in zip(
+                idx.tolist(), tickers[idx].tolist(), es_alcista[idx].tolist(),
+                prob[idx].tolist(), total_indicadores[idx].tolist()
+            )
+        ])
     
-    def _detectar_divergencias(self, ticker: str, signals: Dict):
+    def _indexar_divergencias(self, validos: List[Tuple[str, Dict]]) -> List[Tuple]:
+        """
+        Recorre una sola vez las alertas de todos los activos y devuelve las
+        divergencias ya clasificadas
+        
+        Returns:
+            Lista de tuplas (ticker, es_alcista, indicador, prioridad, tipo, descripcion)
+        """
+        divergencias = []
+        for ticker, data in validos:
+            for alert in data['signals'].get('alerts', []):
+                info = TIPOS_DIVERGENCIA.get(alert['type'])
+                if info is None:
+                    continue
+                es_alcista, indicador = info
+                divergencias.append((
+                    ticker,
+                    es_alcista,
+                    indicador,
+                    alert['priority'],
+                    alert['type'],
+                    alert['description']
+                ))
+        return divergencias
+    
+    def _detectar_divergencias(self, divergencias: List[Tuple]):
         """
         Detecta divergencias RSI/MACD
         Similar a: "Se detectó una divergencia alcista en el RSI para 'NVDA'"
         """
-        # Buscar divergencias en las alertas existentes
-        for alert in signals.get('alerts', []):
-            if 'DIVERGENCIA' in alert['type']:
-                tipo_div = alert['type']
-                es_alcista = 'ALCISTA' in tipo_div
-                
-                self.oportunidades.append({
-                    'tipo': 'DIVERGENCIA_DETECTADA',
-                    'ticker': ticker,
-                    'titulo': f"💡 Oportunidad: Divergencia {'Alcista' if es_alcista else 'Bajista'}",
-                    'descripcion': f"Se detectó una divergencia {'alcista' if es_alcista else 'bajista'} en el {'RSI' if 'RSI' in tipo_div else 'MACD'} para '{ticker}'.",
-                    'severidad': alert['priority'],
-                    'metricas': {
-                        'tipo_divergencia': tipo_div,
-                        'descripcion_tecnica': alert['description']
-                    }
-                })
+        self.oportunidades.extend([
+            self._evento(
+                'DIVERGENCIA_DETECTADA', ticker, prioridad,
+                {
+                    'tipo_divergencia': tipo_div,
+                    'descripcion_tecnica': descripcion
+                },
+                plantilla='DIVERGENCIA_ALCISTA' if es_alcista else 'DIVERGENCIA_BAJISTA',
+                indicador=indicador
+            )
+            for ticker, es_alcista, indicador, prioridad, tipo_div, descripcion in divergencias
+        ])
     
-    def _detectar_cambios_abruptos_precio(self, ticker: str, metrics: Dict):
+    def _detectar_cambios_abruptos_precio(self, tickers: np.ndarray, soa: Dict[str, np.ndarray],
+                                          umbrales: Dict[str, np.ndarray]):
         """
         Detecta cambios abruptos de precio (>5%)
         """
-        close = metrics.get('close', 0)
-        close_prev = metrics.get('close_prev', 0)
+        close = soa['close']
+        close_prev = soa['close_prev']
+        cambio_pct = soa['cambio_pct']
         
-        if close_prev > 0:
-            cambio_pct = ((close - close_prev) / close_prev) * 100
-            
-            if abs(cambio_pct) > 5:
-                self.anomalias.append({
-                    'tipo': 'CAMBIO_PRECIO_ABRUPTO',
-                    'ticker': ticker,
-                    'titulo': f"⚠️ Anomalía Detectada",
-                    'descripcion': f"Cambio de precio abrupto en '{ticker}': {cambio_pct:+.2f}% en última sesión.",
-                    'severidad': 'ALTA' if abs(cambio_pct) > 10 else 'MEDIA',
-                    'metricas': {
-                        'cambio_porcentaje': f"{cambio_pct:+.2f}%",
-                        'precio_actual': close,
-                        'precio_anterior': close_prev
-                    }
-                })
+        idx = np.flatnonzero(umbrales['cambio_abrupto'])
+        self.anomalias.extend([
+            self._evento(
+                'CAMBIO_PRECIO_ABRUPTO', ticker,
+                'ALTA' if abs(cambio) > CAMBIO_PRECIO_ALTO else 'MEDIA',
+                {
+                    'cambio_porcentaje': cambio,
+                    'precio_actual': precio,
+                    'precio_anterior': previo
+                }
+            )
+            for ticker, cambio, precio, previo in zip(
+                tickers[idx].tolist(), cambio_pct[idx].tolist(),
+                close[idx].tolist(), close_prev[idx].tolist()
+            )
+        ])
     
-    def _detectar_rsi_extremo(self, ticker: str, metrics: Dict):
+    def _detectar_rsi_extremo(self, tickers: np.ndarray, soa: Dict[str, np.ndarray],
+                              umbrales: Dict[str, np.ndarray]):
         """
         Detecta RSI en zona extrema (>75 o <25)
         """
-        rsi = metrics.get('rsi', 50)
-        
-        if rsi > 75:
-            self.alertas_detectadas.append({
-                'tipo': 'RSI_SOBRECOMPRA',
-                'ticker': ticker,
-                'titulo': f"💡 Alerta",
-                'descripcion': f"'{ticker}' en zona de sobrecompra extrema (RSI: {rsi:.1f}). Posible corrección.",
-                'severidad': 'MEDIA',
-                'metricas': {
-                    'rsi': rsi,
-                    'umbral': 75
-                }
-            })
-        
-        elif rsi < 25:
-            self.alertas_detectadas.append({
-                'tipo': 'RSI_SOBREVENTA',
-                'ticker': ticker,
-                'titulo': f"💡 Alerta",
-                'descripcion': f"'{ticker}' en zona de sobreventa extrema (RSI: {rsi:.1f}). Posible rebote.",
-                'severidad': 'MEDIA',
-                'metricas': {
-                    'rsi': rsi,
-                    'umbral': 25
+        rsi = soa['rsi']
+        
+        sobrecompra = umbrales['sobrecompra']
+        sobreventa = umbrales['sobreventa']
+        
+        idx = np.flatnonzero(sobrecompra | sobreventa)
+        self.alertas_detectadas.extend([
+            self._evento(
+                'RSI_SOBRECOMPRA' if es_sobrecompra else 'RSI_SOBREVENTA', ticker, 'MEDIA',
+                {
+                    'rsi': rsi_i,
+                    'umbral': int(RSI_SOBRECOMPRA_EXTREMA if es_sobrecompra else RSI_SOBREVENTA_EXTREMA)
                 }
-            })
+            )
+            for ticker, es_sobrecompra, rsi_i in zip(
+                tickers[idx].tolist(), sobrecompra[idx].tolist(), rsi[idx].tolist()
+            )
+        ])
     
-    def _detectar_correlaciones_rotas(self, todos_activos: Dict):
+    def _detectar_correlaciones_rotas(self, tickers: np.ndarray, soa: Dict[str, np.ndarray]):
         """
         Detecta correlaciones rotas entre activos
         Similar a: "La correlación histórica entre 'XOM' y el precio del petróleo..."
         """
         # Nota: Esta es una versión simplificada
-        # En producción, necesitarías datos históricos de correlación
+        # En producción, necesitarías datos históricos de correlación.
+        # Solo se vigilan los pares de PARES_CORRELACIONADOS: un par se marca
+        # si ambos activos se mueven significativamente (>2%) en direcciones
+        # opuestas. Dos activos sin correlación histórica no dicen nada.
+        posicion = {ticker: i for i, ticker in enumerate(tickers.tolist())}
+        pares = [par for par in PARES_CORRELACIONADOS if par[0] in posicion and par[1] in posicion]
+        if not pares:
+            return
         
-        # Ejemplo: Detectar si BTC y ETH se están moviendo en direcciones opuestas
-        btc_data = todos_activos.get('BTC-USD', {})
-        eth_data = todos_activos.get('ETH-USD', {})
+        cambio_pct = soa['cambio_pct']
+        cambio_a = cambio_pct[[posicion[par[0]] for par in pares]]
+        cambio_b = cambio_pct[[posicion[par[1]] for par in pares]]
+        rotos = ((np.sign(cambio_a) * np.sign(cambio_b) < 0) &
+                 (np.abs(cambio_a) > CAMBIO_CORRELACION_MIN) &
+                 (np.abs(cambio_b) > CAMBIO_CORRELACION_MIN))
         
-        if btc_data and eth_data:
-            btc_metrics = btc_data.get('latest_metrics', {})
-            eth_metrics = eth_data.get('latest_metrics', {})
-            
-            btc_change = btc_metrics.get('close', 0) - btc_metrics.get('close_prev', 0)
-            eth_change = eth_metrics.get('close', 0) - eth_metrics.get('close_prev', 0)
-            
-            # Si BTC sube y ETH baja (o viceversa) significativamente
-            if (btc_change > 0 and eth_change < 0) or (btc_change < 0 and eth_change > 0):
-                btc_pct = (btc_change / btc_metrics.get('close_prev', 1)) * 100
-                eth_pct = (eth_change / eth_metrics.get('close_prev', 1)) * 100
-                
-                if abs(btc_pct) > 2 and abs(eth_pct) > 2:
-                    self.anomalias.append({
-                        'tipo': 'CORRELACION_ROTA',
-                        'ticker': 'BTC-USD / ETH-USD',
-                        'titulo': f"⚠️ Anomalía: Correlación Rota",
-                        'descripcion': f"La correlación histórica entre 'BTC-USD' y 'ETH-USD' se ha desviado significativamente. BTC {btc_pct:+.2f}% vs ETH {eth_pct:+.2f}%.",
-                        'severidad': 'MEDIA',
-                        'metricas': {
-                            'btc_cambio': f"{btc_pct:+.2f}%",
-                            'eth_cambio': f"{eth_pct:+.2f}%"
-                        }
-                    })
+        self.anomalias.extend([
+            self._evento(
+                'CORRELACION_ROTA', f"{activo_a} / {activo_b}", 'MEDIA',
+                {
+                    f"{prefijo_a}_cambio": cambio_a_i,
+                    f"{prefijo_b}_cambio": cambio_b_i
+                },
+                plantilla=f"CORRELACION_ROTA {activo_a}/{activo_b}"
+            )
+            for (activo_a, activo_b, prefijo_a, prefijo_b), cambio_a_i, cambio_b_i in zip(
+                [pares[i] for i in np.flatnonzero(rotos)],
+                cambio_a[rotos].tolist(),
+                cambio_b[rotos].tolist()
+            )
+        ])
@@ -6,13 +6,277 @@ Fecha: 25 de octubre de 2025
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import Dict, Optional
-from datetime import datetime
-from bs4 import BeautifulSoup
+import bisect
 import re
-import warnings
-warnings.filterwarnings('ignore')
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from importlib.util import find_spec
+
+# Parser de BeautifulSoup; solo se comprueba que exista, la importación de
+# bs4/lxml se difiere hasta el primer scrape que la necesite
+LXML_AVAILABLE = find_spec('lxml') is not None
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Vigencia de la cache: FRED publica series diarias/mensuales, el
+# Fear & Greed se actualiza a lo largo del día
+TTL_FRED = 12 * 3600
+TTL_SENTIMIENTO = 3600
+TTL_CONTEXTO = 60  # Reutilizar el contexto completo entre llamadas cercanas
+
+# Series FRED del contexto macro: clave del contexto -> ID de la serie
+SERIES_MACRO = {
+    'fed_rate': 'FEDFUNDS',
+    'inflation': 'CPIAUCSL',
+    'unemployment': 'UNRATE',
+    'yield_curve': 'T10Y2Y',
+}
+
+# Clasificación Fear & Greed: límites superiores (exclusivos) de cada tramo
+_FG_BINS = (25, 45, 55, 75)
+_FG_LABELS = ('Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed')
+_FG_KEYS = ('extreme_fear', 'fear', 'neutral', 'greed', 'extreme_greed')
+
+# Bias de trading por régimen macro:
+# régimen -> (estrategia, sectores preferidos, ajuste de riesgo, razonamiento)
+_GROWTH_SECTORS = ('Technology', 'Consumer Discretionary', 'Industrials')
+_DEFENSIVE_SECTORS = ('Utilities', 'Consumer Staples', 'Healthcare')
+_CAUTIOUS_SECTORS = ('Healthcare', 'Consumer Staples', 'Technology')
+_REGIME_TABLE = {
+    'expansión': ('growth', _GROWTH_SECTORS, 1, "Expansión económica → Priorizar growth stocks"),
+    'recesión': ('defensive', _DEFENSIVE_SECTORS, -1, "Recesión → Priorizar sectores defensivos"),
+    'transición': ('cautious', _CAUTIOUS_SECTORS, 0, "Transición → Estrategia balanceada"),
+}
+
+# Clases del div con el valor del Fear & Greed en feargreedmeter.com
+_FG_CLASSES = frozenset({'text-center', 'text-4xl', 'font-semibold', 'text-white'})
+_FG_SELECTOR = 'div.text-center.text-4xl.font-semibold.text-white'
+
+# Atajo sin DOM: <div class="..."> con las cuatro clases (en cualquier orden)
+# cuyo contenido es directamente el número
+_FG_RE = re.compile(
+    r'<div\b[^>]*?\bclass="'
+    + ''.join(r'(?=[^"]*(?<![^\s"])' + re.escape(c) + r'(?![^\s"]))' for c in sorted(_FG_CLASSES))
+    + r'[^"]*"[^>]*>\s*(\d{1,3})\s*<'
+)
+_aviso_regex_emitido = False
+
+
+def _crear_sesion() -> requests.Session:
+    """
+    Crea una sesión HTTP con keep-alive y pool de conexiones
+    
+    Reutilizar la sesión evita repetir el handshake TCP+TLS en cada llamada
+    al mismo host. Sin reintentos: un fallo recurre al último valor conocido.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class _CacheTTL:
+    """
+    Cache en memoria con expiración por entrada, segura entre hilos
+    
+    Se comparte a nivel de clase para que una nueva instancia no vuelva a
+    consultar la red. Las entradas expiradas se conservan para devolverlas
+    si la siguiente consulta falla (stale-on-error).
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entradas = {}  # clave -> (valor, instante de guardado)
+        self._en_curso = {}  # clave -> (Event, [resultado]) de la descarga activa
+        self._lock = threading.Lock()
+    
+    def obtener(self, clave, cargar: Callable):
+        """
+        Devuelve el valor vigente o lo carga con `cargar()` (singleflight)
+        
+        Si varios hilos piden la misma clave con la cache fría, solo el
+        primero ejecuta la descarga; el resto espera y recibe su resultado.
+        """
+        valor = self.vigente(clave)
+        if valor is not None:
+            return valor
+        
+        with self._lock:
+            # Se repite bajo el lock: un líder pudo guardar y terminar entre
+            # la consulta anterior y este punto
+            valor = self._vigente_sin_lock(clave)
+            if valor is not None:
+                return valor
+            en_curso = self._en_curso.get(clave)
+            lider = en_curso is None
+            if lider:
+                en_curso = self._en_curso[clave] = (threading.Event(), [])
+        evento, resultado = en_curso
+        
+        if not lider:
+            evento.wait()
+            return resultado[0] if resultado else None
+        
+        try:
+            resultado.append(cargar())
+            return resultado[0]
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            evento.set()
+    
+    def vigente(self, clave):
+        """Valor de la clave si no ha expirado; None en otro caso"""
+        with self._lock:
+            return self._vigente_sin_lock(clave)
+    
+    def _vigente_sin_lock(self, clave):
+        """Como vigente(), para llamar con self._lock ya tomado"""
+        entrada = self._entradas.get(clave)
+        if entrada is not None and time.monotonic() - entrada[1] < self.ttl:
+            return entrada[0]
+        return None
+    
+    def ultimo(self, clave):
+        """Último valor guardado, aunque haya expirado; None si nunca hubo"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        return entrada[0] if entrada is not None else None
+    
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._entradas[clave] = (valor, time.monotonic())
+
+
+def _leer_json(response: requests.Response):
+    """
+    Decodifica el cuerpo JSON de una respuesta
+    
+    orjson parsea directamente los bytes (sin decodificar a str) y es 2-5x
+    más rápido que json; si no está instalado se usa response.json().
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _es_div_indice(clases: Optional[str]) -> bool:
+    """
+    Filtro de SoupStrainer para el div del valor del Fear & Greed
+    (clases: text-center text-4xl font-semibold mb-1 text-white)
+    """
+    return bool(clases) and _FG_CLASSES.issubset(clases.split())
+
+
+def _extraer_valor_indice(html: str) -> Optional[int]:
+    """
+    Extrae el valor del Fear & Greed del HTML de feargreedmeter.com
+    
+    Intenta primero una expresión regular precompilada; si no encuentra el
+    valor (cambio de maquetado), parsea con selectolax (lexbor) si está
+    disponible o, si no, con BeautifulSoup construyendo solo los divs
+    candidatos.
+    
+    Returns:
+        Primer valor numérico encontrado o None
+    """
+    global _aviso_regex_emitido
+    
+    match = _FG_RE.search(html)
+    if match:
+        return int(match.group(1))
+    
+    if not _aviso_regex_emitido:
+        _aviso_regex_emitido = True
+        print("⚠️ Fear & Greed: el atajo regex no encontró el valor; usando parser HTML")
+    
+    if SELECTOLAX_AVAILABLE:
+        for node in LexborHTMLParser(html).css(_FG_SELECTOR):
+            text = node.text(strip=True)
+            if text.isdigit():
+                return int(text)
+        return None
+    
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    # lxml es 5-10x más rápido que html.parser; el resto del DOM se descarta
+    soup = BeautifulSoup(html, 'lxml' if LXML_AVAILABLE else 'html.parser',
+                         parse_only=SoupStrainer('div', class_=_es_div_indice))
+    for div in soup.find_all('div'):
+        text = div.text.strip()
+        if text.isdigit():
+            return int(text)
+    return None
+
+
+@lru_cache(maxsize=256)
+def _clasificar_regimen(yield_curve: Optional[float], unemployment: Optional[float]) -> str:
+    """
+    Clasifica el régimen de mercado (memoizado: función pura de la curva
+    10Y-2Y y el desempleo, que cambian con poca frecuencia)
+    """
+    if yield_curve is None or unemployment is None:
+        return 'unknown'
+    
+    # Curva invertida (10Y-2Y < 0) = alto riesgo de recesión
+    if yield_curve < 0:
+        if unemployment > 5.0:
+            return 'recesión'
+        else:
+            return 'transición'  # Señal de alerta
+    
+    # Curva normal con bajo desempleo = expansión
+    if yield_curve > 0.5 and unemployment < 4.5:
+        return 'expansión'
+    
+    return 'transición'
+
+
+@lru_cache(maxsize=256)
+def _evaluar_riesgo(yield_curve: Optional[float], unemployment: Optional[float]) -> str:
+    """
+    Evalúa el nivel de riesgo macro (memoizado, como _clasificar_regimen)
+    """
+    if yield_curve is None or unemployment is None:
+        return 'medium'
+    
+    risk_score = 0
+    
+    # Curva invertida = +2 puntos de riesgo
+    if yield_curve < 0:
+        risk_score += 2
+    
+    # Desempleo alto = +1 punto
+    if unemployment > 5.5:
+        risk_score += 1
+    
+    # Desempleo muy bajo (sobrecalentamiento) = +1 punto
+    if unemployment < 3.5:
+        risk_score += 1
+    
+    if risk_score >= 2:
+        return 'high'
+    elif risk_score == 1:
+        return 'medium'
+    else:
+        return 'low'
 
 
 class MacroContext:
@@ -20,6 +284,8 @@ class MacroContext:
     Obtiene contexto macroeconómico desde FRED API
     """
     
+    cache = _CacheTTL(TTL_FRED)  # Compartida entre instancias
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         Args:
@@ -27,7 +293,7 @@ class MacroContext:
         """
         self.api_key = api_key
         self.base_url = "https://api.stlouisfed.org/fred/series/observations"
-        self.cache = {}  # Cache para evitar llamadas repetidas
+        self.session = _crear_sesion()
         
     def get_fred_data(self, series_id: str) -> Optional[float]:
         """
@@ -43,10 +309,12 @@ class MacroContext:
             print("⚠️ FRED API key no configurada. Usando valores por defecto.")
             return None
         
-        # Revisar cache
-        if series_id in self.cache:
-            return self.cache[series_id]
-        
+        return self.cache.obtener(series_id, lambda: self._descargar_serie(series_id))
+    
+    def _descargar_serie(self, series_id: str) -> Optional[float]:
+        """
+        Descarga el último valor de una serie (sin consultar la cache)
+        """
         try:
             params = {
                 'series_id': series_id,
@@ -56,22 +324,46 @@ class MacroContext:
                 'file_type': 'json'
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = self.session.get(self.base_url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _leer_json(response)
             observations = data.get('observations', [])
             
             if observations:
-                value = float(observations[0]['value'])
-                self.cache[series_id] = value
+                raw_value = observations[0]['value']
+                # FRED marca las observaciones sin dato con '.'
+                if raw_value in ('.', '', None):
+                    return None
+                value = float(raw_value)
+                self.cache.guardar(series_id, value)
                 return value
             
         except Exception as e:
-            print(f"⚠️ Error obteniendo {series_id} de FRED: {e}")
+            print(f"⚠️ Error obteniendo {series_id} de FRED ({type(e).__name__}): {e}")
+            # Último valor conocido si lo hay
+            return self.cache.ultimo(series_id)
         
         return None
     
+    def _get_fred_batch(self, series_ids: List[str]) -> Dict[str, Optional[float]]:
+        """
+        Obtiene el último valor de varias series de FRED
+        
+        FRED no ofrece un endpoint multi-serie, así que se lanza una petición
+        por serie en paralelo sobre la misma sesión (conexiones reutilizadas)
+        
+        Returns:
+            Diccionario serie -> último valor (None si falla)
+        """
+        if not series_ids:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(series_ids)) as executor:
+            valores = list(executor.map(self.get_fred_data, series_ids))
+        
+        return dict(zip(series_ids, valores))
+    
     def get_macro_context(self) -> Dict:
         """
         Obtiene contexto macroeconómico completo
@@ -92,10 +384,11 @@ class MacroContext:
         }
         
         # Obtener datos
-        fed_rate = self.get_fred_data('FEDFUNDS')
-        inflation = self.get_fred_data('CPIAUCSL')
-        unemployment = self.get_fred_data('UNRATE')
-        yield_curve = self.get_fred_data('T10Y2Y')
+        valores = self._get_fred_batch(list(SERIES_MACRO.values()))
+        fed_rate = valores[SERIES_MACRO['fed_rate']]
+        inflation = valores[SERIES_MACRO['inflation']]
+        unemployment = valores[SERIES_MACRO['unemployment']]
+        yield_curve = valores[SERIES_MACRO['yield_curve']]
         
         context['fed_rate'] = fed_rate
         context['unemployment'] = unemployment
@@ -133,21 +426,7 @@ class MacroContext:
         Returns:
             'expansión', 'recesión', 'transición', 'unknown'
         """
-        if yield_curve is None or unemployment is None:
-            return 'unknown'
-        
-        # Curva invertida (10Y-2Y < 0) = alto riesgo de recesión
-        if yield_curve < 0:
-            if unemployment > 5.0:
-                return 'recesión'
-            else:
-                return 'transición'  # Señal de alerta
-        
-        # Curva normal con bajo desempleo = expansión
-        if yield_curve > 0.5 and unemployment < 4.5:
-            return 'expansión'
-        
-        return 'transición'
+        return _clasificar_regimen(yield_curve, unemployment)
     
     def _assess_risk(self, yield_curve: Optional[float], 
                      unemployment: Optional[float]) -> str:
@@ -157,29 +436,7 @@ class MacroContext:
         Returns:
             'low', 'medium', 'high'
         """
-        if yield_curve is None or unemployment is None:
-            return 'medium'
-        
-        risk_score = 0
-        
-        # Curva invertida = +2 puntos de riesgo
-        if yield_curve < 0:
-            risk_score += 2
-        
-        # Desempleo alto = +1 punto
-        if unemployment > 5.5:
-            risk_score += 1
-        
-        # Desempleo muy bajo (sobrecalentamiento) = +1 punto
-        if unemployment < 3.5:
-            risk_score += 1
-        
-        if risk_score >= 2:
-            return 'high'
-        elif risk_score == 1:
-            return 'medium'
-        else:
-            return 'low'
+        return _evaluar_riesgo(yield_curve, unemployment)
 
 
 class SentimentAnalyzer:
@@ -187,8 +444,19 @@ class SentimentAnalyzer:
     Analiza sentimiento del mercado usando Fear & Greed Index
     """
     
+    cache = _CacheTTL(TTL_SENTIMIENTO)  # Compartida entre instancias
+    
     def __init__(self):
-        self.cache = {}
+        self.session = _crear_sesion()
+        
+        # Headers para simular navegador real (feargreedmeter.com)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        })
     
     def get_fear_greed_stocks(self) -> Dict:
         """
@@ -197,56 +465,46 @@ class SentimentAnalyzer:
         Returns:
             {'value': int, 'classification': str}
         """
-        if 'stocks' in self.cache:
-            return self.cache['stocks']
-        
+        return self.cache.obtener('stocks', self._descargar_stocks)
+    
+    def _descargar_stocks(self) -> Dict:
+        """
+        Descarga y parsea el Fear & Greed de acciones (sin consultar la cache)
+        """
         try:
             # Nueva fuente: feargreedmeter.com
             url = "https://feargreedmeter.com/"
             
-            # Headers para simular navegador real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
+            # GET condicional: si la página no cambió el servidor responde
+            # 304 sin cuerpo y se reutiliza el último valor parseado
+            anterior = self.cache.ultimo('stocks')
+            validadores = self.cache.ultimo('stocks_http')
+            headers = {}
+            if anterior is not None and validadores is not None:
+                etag, last_modified = validadores
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            # Parse HTML con BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if response.status_code == 304:
+                self.cache.guardar('stocks', anterior)
+                return anterior
             
-            # Buscar el valor del índice (número grande en el centro)
-            # Buscar todos los divs y filtrar por clases
-            fear_greed_value = None
+            self.cache.guardar('stocks_http', (response.headers.get('ETag'),
+                                               response.headers.get('Last-Modified')))
             
-            for div in soup.find_all('div'):
-                classes = div.get('class', [])
-                # Buscar div con clases específicas: text-center text-4xl font-semibold mb-1 text-white
-                if ('text-center' in classes and 'text-4xl' in classes and 
-                    'font-semibold' in classes and 'text-white' in classes):
-                    text = div.text.strip()
-                    if text.isdigit():
-                        fear_greed_value = int(text)
-                        break
+            # Buscar el valor del índice (número grande en el centro)
+            fear_greed_value = _extraer_valor_indice(response.text)
             
             if fear_greed_value is None:
                 raise ValueError("No se pudo encontrar el valor del índice")
             
             # Clasificación inferida según valor (estándar Fear & Greed)
-            if fear_greed_value < 25:
-                classification = "Extreme Fear"
-            elif fear_greed_value < 45:
-                classification = "Fear"
-            elif fear_greed_value < 55:
-                classification = "Neutral"
-            elif fear_greed_value < 75:
-                classification = "Greed"
-            else:
-                classification = "Extreme Greed"
+            classification = _FG_LABELS[bisect.bisect_right(_FG_BINS, fear_greed_value)]
             
             result = {
                 'value': fear_greed_value,
@@ -255,11 +513,14 @@ class SentimentAnalyzer:
                 'source': 'feargreedmeter.com'
             }
             
-            self.cache['stocks'] = result
+            self.cache.guardar('stocks', result)
             return result
             
         except Exception as e:
             print(f"⚠️ Error obteniendo Fear & Greed (stocks): {e}")
+            stale = self.cache.ultimo('stocks')
+            if stale is not None:
+                return stale
             return {
                 'value': 50,
                 'classification': 'Neutral',
@@ -274,15 +535,18 @@ class SentimentAnalyzer:
         Returns:
             {'value': int, 'classification': str}
         """
-        if 'crypto' in self.cache:
-            return self.cache['crypto']
-        
+        return self.cache.obtener('crypto', self._descargar_crypto)
+    
+    def _descargar_crypto(self) -> Dict:
+        """
+        Descarga el Fear & Greed de crypto (sin consultar la cache)
+        """
         try:
             url = "https://api.alternative.me/fng/"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _leer_json(response)
             fng_data = data.get('data', [{}])[0]
             
             result = {
@@ -291,15 +555,19 @@ class SentimentAnalyzer:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache['crypto'] = result
+            self.cache.guardar('crypto', result)
             return result
             
         except Exception as e:
             print(f"⚠️ Error obteniendo Fear & Greed (crypto): {e}")
+            stale = self.cache.ultimo('crypto')
+            if stale is not None:
+                return stale
             return {
                 'value': 50,
                 'classification': 'Neutral',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat(),
+                'source': 'fallback'
             }
     
     def get_sentiment_summary(self) -> Dict:
@@ -311,8 +579,13 @@ class SentimentAnalyzer:
         """
         print("\n📊 Obteniendo sentimiento del mercado...")
         
-        stocks_sentiment = self.get_fear_greed_stocks()
-        crypto_sentiment = self.get_fear_greed_crypto()
+        # Fuentes independientes: se consultan a la vez (la cache es segura entre hilos)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stocks_future = executor.submit(self.get_fear_greed_stocks)
+            crypto_future = executor.submit(self.get_fear_greed_crypto)
+        
+        stocks_sentiment = stocks_future.result()
+        crypto_sentiment = crypto_future.result()
         
         print(f"   Stocks Fear & Greed: {stocks_sentiment['value']} ({stocks_sentiment['classification']})")
         print(f"   Crypto Fear & Greed: {crypto_sentiment['value']} ({crypto_sentiment['classification']})")
@@ -332,16 +605,7 @@ class SentimentAnalyzer:
         """
         avg = (stocks_value + crypto_value) / 2
         
-        if avg < 25:
-            return 'extreme_fear'
-        elif avg < 45:
-            return 'fear'
-        elif avg < 55:
-            return 'neutral'
-        elif avg < 75:
-            return 'greed'
-        else:
-            return 'extreme_greed'
+        return _FG_KEYS[bisect.bisect_right(_FG_BINS, avg)]
 
 
 class MarketContextIntegrated:
@@ -356,26 +620,43 @@ class MarketContextIntegrated:
         """
         self.macro = MacroContext(fred_api_key)
         self.sentiment = SentimentAnalyzer()
+        self._last_full = None
+        self._last_full_ts = 0.0
     
-    def get_full_context(self) -> Dict:
+    def get_full_context(self, force: bool = False) -> Dict:
         """
         Obtiene contexto completo del mercado
         
+        Args:
+            force: Si True, ignora el contexto obtenido hace menos de
+                   TTL_CONTEXTO segundos y vuelve a consultarlo
+        
         Returns:
             Diccionario con macro + sentimiento
         """
+        if (not force and self._last_full is not None and
+                time.monotonic() - self._last_full_ts < TTL_CONTEXTO):
+            return self._last_full
+        
         print("\n" + "="*80)
         print("🌍 CONTEXTO DE MERCADO")
         print("="*80)
         
-        macro_context = self.macro.get_macro_context()
-        sentiment_context = self.sentiment.get_sentiment_summary()
+        # Macro y sentimiento son I/O independiente: se consultan a la vez
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            macro_future = executor.submit(self.macro.get_macro_context)
+            sentiment_future = executor.submit(self.sentiment.get_sentiment_summary)
         
-        return {
+        macro_context = macro_future.result()
+        sentiment_context = sentiment_future.result()
+        
+        self._last_full = {
             'macro': macro_context,
             'sentiment': sentiment_context,
             'timestamp': datetime.now().isoformat()
         }
+        self._last_full_ts = time.monotonic()
+        return self._last_full
     
     def get_trading_bias(self, context: Optional[Dict] = None) -> Dict:
         """
@@ -402,23 +683,13 @@ class MarketContextIntegrated:
         }
         
         # === RÉGIMEN MACRO ===
-        if regime == 'expansión':
-            bias['recommended_strategy'] = 'growth'
-            bias['sector_preference'] = ['Technology', 'Consumer Discretionary', 'Industrials']
-            bias['risk_adjustment'] = 1
-            bias['reasoning'].append("Expansión económica → Priorizar growth stocks")
-        
-        elif regime == 'recesión':
-            bias['recommended_strategy'] = 'defensive'
-            bias['sector_preference'] = ['Utilities', 'Consumer Staples', 'Healthcare']
-            bias['risk_adjustment'] = -1
-            bias['reasoning'].append("Recesión → Priorizar sectores defensivos")
-        
-        elif regime == 'transición':
-            bias['recommended_strategy'] = 'cautious'
-            bias['sector_preference'] = ['Healthcare', 'Consumer Staples', 'Technology']
-            bias['risk_adjustment'] = 0
-            bias['reasoning'].append("Transición → Estrategia balanceada")
+        regimen = _REGIME_TABLE.get(regime)
+        if regimen is not None:
+            strategy, sectors, adjustment, reason = regimen
+            bias['recommended_strategy'] = strategy
+            bias['sector_preference'] = list(sectors)  # Lista propia: el llamador puede modificarla
+            bias['risk_adjustment'] = adjustment
+            bias['reasoning'].append(reason)
         
         # === RIESGO MACRO ===
         if risk_level == 'high':
@@ -13,9 +13,19 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 from typing import List, Dict, Tuple, Optional
-from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+from datetime import datetime, date
+from pathlib import Path
+from functools import lru_cache
+from importlib.util import find_spec
+import hashlib
+import json
+import time
+
+from _njit import NUMBA_AVAILABLE
+from _radar_kernel import (
+    ventanas_radar, BARRAS_NECESARIAS, VENTANA_SMA_CORTA, VENTANA_SMA_MEDIA,
+    VENTANA_SMA_LARGA, VENTANA_EXTREMOS, VENTANA_ATR, VENTANA_VOLUMEN
+)
 
 # Importar contexto de mercado (Opción B: solo sentimiento)
 try:
@@ -25,6 +35,302 @@ except ImportError:
     SENTIMENT_AVAILABLE = False
     print("⚠️ market_context.py no disponible. Ejecutando sin sentimiento.")
 
+# Parquet requiere un motor (pyarrow o fastparquet); sin él se exporta a CSV
+PARQUET_AVAILABLE = find_spec('pyarrow') is not None or find_spec('fastparquet') is not None
+
+# Cache en disco de yf.download. La vela en curso (diaria incluida) cambia
+# durante la sesión y cripto cotiza 24/7, así que el TTL solo cubre las
+# repeticiones dentro de un mismo ciclo: caduca antes del siguiente
+# (SVGA_INTERVAL_MINUTES, 15 min por defecto)
+CACHE_DIR = Path.home() / '.cache' / 'market_radar'
+TTL_DESCARGA = 5 * 60
+
+# Niveles de confianza: score en (0, 50] BAJA, (50, 70] MEDIA, (70, 100] ALTA.
+# Se guardan como código int8 (-1 = sin clasificar) y se etiquetan al mostrar
+UMBRALES_CONFIANZA = np.array([0, 50, 70, 100])
+NIVELES_CONFIANZA = np.array(['BAJA', 'MEDIA', 'ALTA'])
+
+# Columnas (y dtypes) del DataFrame de métricas del radar, en orden
+DTYPES_METRICAS = {
+    'price': np.float32,
+    'price_change_pct': np.float32,
+    'volume': np.float32,
+    'rvol': np.float32,
+    'sma_20': np.float32,
+    'sma_50': np.float32,
+    'sma_200': np.float32,
+    'above_sma50': np.bool_,
+    'above_sma200': np.bool_,
+    'golden_cross': np.bool_,
+    'death_cross': np.bool_,
+    'breakout_up': np.bool_,
+    'breakout_down': np.bool_,
+    'roc_10d': np.float32,
+    'atr_percent': np.float32,
+    'high_volume': np.bool_,
+    'strong_momentum': np.bool_,
+}
+
+# Fear & Greed memoizado por (tipo, fecha ISO): cambia como mucho una vez al día
+_SENTIMIENTO_DIARIO: Dict[Tuple[str, str], Dict] = {}
+
+
+def _descargar_con_cache(tickers: List[str], period: str, interval: str,
+                         threads: bool = True) -> pd.DataFrame:
+    """
+    yf.download con cache en disco por (tickers, período, intervalo)
+    
+    Una descarga repetida dentro de TTL_DESCARGA (5 min) lee el DataFrame
+    guardado en lugar de ir a la red.
+    """
+    clave = repr((sorted(tickers), period, interval))
+    ruta = CACHE_DIR / f"{hashlib.sha1(clave.encode()).hexdigest()}.pkl"
+    
+    try:
+        if ruta.exists() and time.time() - ruta.stat().st_mtime < TTL_DESCARGA:
+            return pd.read_pickle(ruta)
+    except Exception as e:
+        print(f"   ⚠️ Cache de descarga ilegible, se descarga de nuevo: {e}")
+    
+    data = yf.download(
+        tickers,
+        period=period,
+        interval=interval,
+        group_by='ticker',
+        auto_adjust=True,
+        progress=False,
+        threads=threads
+    )
+    
+    if not data.empty:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            data.to_pickle(ruta)
+        except OSError as e:
+            print(f"   ⚠️ No se pudo guardar la cache de descarga: {e}")
+    
+    return data
+
+
+def _codigo_confianza(score: np.ndarray) -> np.ndarray:
+    """
+    Código int8 de confianza por score (mismos intervalos que pd.cut)
+    
+    Returns:
+        0 BAJA, 1 MEDIA, 2 ALTA; -1 si el score es NaN o queda fuera de (0, 100]
+    """
+    codigos = np.digitize(score, UMBRALES_CONFIANZA, right=True).astype(np.int8) - 1
+    fuera = np.isnan(score) | (score <= UMBRALES_CONFIANZA[0]) | (score > UMBRALES_CONFIANZA[-1])
+    codigos[fuera] = -1
+    return codigos
+
+
+def _etiqueta_confianza(codigo: int) -> str:
+    """Etiqueta legible de un código de confianza"""
+    return str(NIVELES_CONFIANZA[codigo]) if codigo >= 0 else 'N/A'
+
+
+def _puntuar_candidatos(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Score técnico base (0-90 puntos) y sus componentes, por fila
+    
+    Base de calculate_candidate_score, que le suma el ajuste de sentimiento.
+    El ranking de apply_filters usa su propia ponderación.
+    
+    Returns:
+        Dict con score_momentum, score_volume, score_trend, score_signals
+        y score_base
+    """
+    componentes = {
+        # MOMENTUM (0-25 puntos)
+        'score_momentum': np.clip(df['roc_10d'].to_numpy(dtype=np.float64), -10, 25) * 0.7,
+        # VOLUMEN (0-15 puntos)
+        'score_volume': np.clip(df['rvol'].to_numpy(dtype=np.float64) - 1, 0, 5) * 3,
+        # TENDENCIA (0-20 puntos)
+        'score_trend': (df['above_sma50'].to_numpy(dtype=bool) * 10 +
+                        df['above_sma200'].to_numpy(dtype=bool) * 10),
+        # SEÑALES ESPECIALES (0-30 puntos)
+        'score_signals': (df['breakout_up'].to_numpy(dtype=bool) * 15 +
+                          df['golden_cross'].to_numpy(dtype=bool) * 15),
+    }
+    componentes['score_base'] = np.clip(sum(componentes.values()), 0, 90)
+    return componentes
+
+
+def _descargar_sp500() -> List[str]:
+    """Componentes del S&P 500 desde Wikipedia"""
+    import requests
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+    response = requests.get(url, headers=headers)
+    tables = pd.read_html(response.text)
+    sp500_table = tables[0]
+    return sp500_table['Symbol'].str.replace('.', '-', regex=False).tolist()
+
+
+def _descargar_nasdaq100() -> List[str]:
+    """Componentes del NASDAQ 100 desde Wikipedia"""
+    url = 'https://en.wikipedia.org/wiki/Nasdaq-100'
+    tables = pd.read_html(url)
+    nasdaq_table = tables[4]  # La tabla de componentes suele ser la 4ta
+    return nasdaq_table['Ticker'].str.replace('.', '-', regex=False).tolist()
+
+
+DESCARGAS_INDICES = {
+    'sp500': _descargar_sp500,
+    'nasdaq100': _descargar_nasdaq100,
+}
+
+
+@lru_cache(maxsize=4)
+def _tickers_indice(indice: str, dia: str) -> Tuple[str, ...]:
+    """
+    Componentes de un índice, cacheados en memoria y en un JSON diario
+    
+    La composición cambia trimestralmente: solo la primera llamada del día
+    descarga y parsea Wikipedia. Si la descarga falla, la excepción se
+    propaga y no queda cacheada.
+    
+    Args:
+        indice: Clave de DESCARGAS_INDICES
+        dia: Fecha ISO (parte de la clave para renovar la cache cada día)
+    """
+    ruta = CACHE_DIR / f"{indice}_{dia.replace('-', '')}.json"
+    try:
+        if ruta.exists():
+            return tuple(json.loads(ruta.read_text()))
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️ Cache de {indice} ilegible, se descarga de nuevo: {e}")
+    
+    tickers = DESCARGAS_INDICES[indice]()
+    
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(tickers))
+        # Solo se conserva el JSON del día: los anteriores se borran
+        for antigua in CACHE_DIR.glob(f"{indice}_*.json"):
+            if antigua != ruta:
+                antigua.unlink()
+    except OSError as e:
+        print(f"   ⚠️ No se pudo guardar la cache de {indice}: {e}")
+    
+    return tuple(tickers)
+
+
+def _ensamblar_batches(batches: List[Tuple[List[str], pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Une los batches descargados en un único DataFrame (ticker, campo)
+    
+    En lugar de pd.concat (que copia cada bloque y reconstruye el índice de
+    columnas), reserva una sola matriz float32 y copia cada batch en su
+    franja de columnas. Las fechas son la unión de las de todos los batches,
+    igual que el outer join de pd.concat.
+    """
+    fechas = batches[0][1].index
+    campos = []
+    for _, batch_data in batches:
+        fechas = fechas.union(batch_data.index)
+        niveles = batch_data.columns.get_level_values(-1)
+        campos.extend(c for c in niveles.unique() if c not in campos)
+    
+    n_tickers = sum(len(batch_tickers) for batch_tickers, _ in batches)
+    n_campos = len(campos)
+    out = np.empty((len(fechas), n_tickers * n_campos), dtype=np.float32)
+    
+    inicio = 0
+    todos_tickers = []
+    for batch_tickers, batch_data in batches:
+        if not isinstance(batch_data.columns, pd.MultiIndex):
+            # Batch de un solo ticker con columnas planas
+            batch_data = pd.concat({batch_tickers[0]: batch_data}, axis=1)
+        columnas = pd.MultiIndex.from_product([batch_tickers, campos])
+        fin = inicio + len(batch_tickers) * n_campos
+        out[:, inicio:fin] = batch_data.reindex(index=fechas, columns=columnas).to_numpy(dtype=np.float32)
+        todos_tickers.extend(batch_tickers)
+        inicio = fin
+    
+    columnas = pd.MultiIndex.from_product([todos_tickers, campos])
+    return pd.DataFrame(out, index=fechas, columns=columnas)
+
+
+def _media_movil_final(matriz: np.ndarray, ventana: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Media móvil de `ventana` barras en la última y penúltima barra
+    
+    Equivale a rolling(ventana).mean().iloc[-1] / .iloc[-2] por columna.
+    Las dos ventanas comparten ventana - 1 barras, que se suman una sola
+    vez (suma incremental). Una ventana incompleta o con NaN da NaN, como
+    en pandas. La suma se acumula en float64 aunque la matriz sea float32.
+    
+    Returns:
+        Tupla (media actual, media previa), un valor por columna
+    """
+    n_barras, n_columnas = matriz.shape
+    if n_barras < ventana:
+        return np.full(n_columnas, np.nan), np.full(n_columnas, np.nan)
+    comun = matriz[n_barras - ventana:-1].sum(axis=0, dtype=np.float64)
+    actual = (comun + matriz[-1]) / ventana
+    previa = np.full(n_columnas, np.nan)
+    if n_barras > ventana:
+        previa = (matriz[-ventana - 1] + comun) / ventana
+    return actual, previa
+
+
+def _metricas_ventanas(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                       volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Calcula las ventanas móviles del radar para todos los tickers
+    
+    Usa el kernel Numba (paralelo por ticker) si está disponible; si no,
+    la versión NumPy sobre la matriz completa.
+    
+    Args:
+        close, high, low, volume: Matrices (barras × tickers)
+    
+    Returns:
+        Dict con sma_20, sma_50(_prev), sma_200(_prev), high_20, low_20,
+        atr_14 y avg_volume_20 (un valor por ticker)
+    """
+    nombres = ('sma_20', 'sma_50', 'sma_50_prev', 'sma_200', 'sma_200_prev',
+               'high_20', 'low_20', 'atr_14', 'avg_volume_20')
+    
+    # Ninguna ventana mira más atrás de BARRAS_NECESARIAS: recortar una vez
+    # evita transponer o recorrer el resto del histórico
+    close, high, low, volume = (m[-BARRAS_NECESARIAS:] for m in (close, high, low, volume))
+    
+    if NUMBA_AVAILABLE:
+        n_tickers = close.shape[1]
+        salida = {nombre: np.empty(n_tickers) for nombre in nombres}
+        # Una fila contigua por ticker para que cada hilo recorra su serie
+        ventanas_radar(np.ascontiguousarray(close.T), np.ascontiguousarray(high.T),
+                       np.ascontiguousarray(low.T), np.ascontiguousarray(volume.T),
+                       *(salida[nombre] for nombre in nombres))
+        return salida
+    
+    salida = {}
+    salida['sma_20'], _ = _media_movil_final(close, VENTANA_SMA_CORTA)
+    salida['sma_50'], salida['sma_50_prev'] = _media_movil_final(close, VENTANA_SMA_MEDIA)
+    salida['sma_200'], salida['sma_200_prev'] = _media_movil_final(close, VENTANA_SMA_LARGA)
+    
+    # Máximo/mínimo de las 20 barras previas a la última
+    previas = slice(-VENTANA_EXTREMOS - 1, -1)
+    salida['high_20'] = high[previas].max(axis=0)
+    salida['low_20'] = low[previas].min(axis=0)
+    
+    # True Range de las 14 barras del ATR más la anterior; el cierre previo
+    # es la vista desplazada close[:-1], sin insertar un NaN al inicio. fmax
+    # ignora NaN como hacía DataFrame.max(axis=1)
+    h, l, c = (m[-VENTANA_ATR - 1:] for m in (high, low, close))
+    tr = h - l
+    np.fmax(tr[1:], np.abs(h[1:] - c[:-1]), out=tr[1:])
+    np.fmax(tr[1:], np.abs(l[1:] - c[:-1]), out=tr[1:])
+    salida['atr_14'], _ = _media_movil_final(tr, VENTANA_ATR)
+    
+    salida['avg_volume_20'], _ = _media_movil_final(volume, VENTANA_VOLUMEN)
+    return salida
+
 
 class MarketRadar:
     """
@@ -63,15 +369,7 @@ class MarketRadar:
         
         # Intento 1: Wikipedia con headers personalizados
         try:
-            import requests
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-            response = requests.get(url, headers=headers)
-            tables = pd.read_html(response.text)
-            sp500_table = tables[0]
-            tickers = sp500_table['Symbol'].str.replace('.', '-', regex=False).tolist()
+            tickers = list(_tickers_indice('sp500', date.today().isoformat()))
             print(f"✅ {len(tickers)} tickers obtenidos del S&P 500 (Wikipedia)")
             return tickers
         except Exception as e:
@@ -110,10 +408,7 @@ class MarketRadar:
         """
         print("📡 Obteniendo lista de NASDAQ 100...")
         try:
-            url = 'https://en.wikipedia.org/wiki/Nasdaq-100'
-            tables = pd.read_html(url)
-            nasdaq_table = tables[4]  # La tabla de componentes suele ser la 4ta
-            tickers = nasdaq_table['Ticker'].str.replace('.', '-', regex=False).tolist()
+            tickers = list(_tickers_indice('nasdaq100', date.today().isoformat()))
             print(f"✅ {len(tickers)} tickers obtenidos del NASDAQ 100")
             return tickers
         except Exception as e:
@@ -209,6 +504,10 @@ class MarketRadar:
         Returns:
             True si descarga exitosa
         """
+        # Un solo batch: descarga directa, sin ensamblado
+        if len(self.tickers) <= batch_size:
+            return self.download_batch(period=period, interval=interval)
+        
         print(f"\n🔽 Descargando {len(self.tickers)} activos en batches de {batch_size}...")
         print(f"   Período: {period} | Intervalo: {interval}")
         
@@ -220,6 +519,9 @@ class MarketRadar:
             all_data = []
             successful_tickers = []
             
+            # Un batch tras otro: yf.download no es seguro entre hilos (reinicia
+            # los diccionarios globales de yfinance.shared en cada llamada);
+            # dentro de cada batch yfinance ya descarga los tickers en paralelo
             for batch_idx in range(num_batches):
                 start_idx = batch_idx * batch_size
                 end_idx = min((batch_idx + 1) * batch_size, total_tickers)
@@ -228,26 +530,18 @@ class MarketRadar:
                 print(f"   📦 Batch {batch_idx + 1}/{num_batches}: {len(batch_tickers)} tickers...")
                 
                 # Descargar batch
-                batch_data = yf.download(
-                    batch_tickers, 
-                    period=period, 
-                    interval=interval,
-                    group_by='ticker',
-                    auto_adjust=True,
-                    progress=False,
-                    threads=True
-                )
+                batch_data = _descargar_con_cache(batch_tickers, period, interval)
                 
                 if not batch_data.empty:
-                    all_data.append(batch_data)
+                    all_data.append((batch_tickers, batch_data))
                     successful_tickers.extend(batch_tickers)
             
             # Combinar todos los batches
             if all_data:
                 if len(all_data) == 1:
-                    self.data = all_data[0]
+                    self.data = all_data[0][1]
                 else:
-                    self.data = pd.concat(all_data, axis=1)
+                    self.data = _ensamblar_batches(all_data)
                 
                 # Actualizar lista de tickers a solo los exitosos
                 self.tickers = successful_tickers
@@ -278,15 +572,8 @@ class MarketRadar:
         
         try:
             # CLAVE: Una sola llamada a yf.download para TODOS los tickers
-            self.data = yf.download(
-                self.tickers, 
-                period=period, 
-                interval=interval,
-                group_by='ticker',
-                auto_adjust=True,
-                progress=False,
-                threads=True  # Descarga paralela interna
-            )
+            # (descarga paralela interna; cacheada en disco)
+            self.data = _descargar_con_cache(self.tickers, period, interval)
             
             if self.data.empty:
                 print("❌ No se obtuvieron datos")
@@ -299,109 +586,124 @@ class MarketRadar:
             print(f"❌ Error en descarga batch: {e}")
             return False
     
+    def _extraer_matrices(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        Extrae Close/High/Low/Volume como matrices float32 (barras × tickers)
+        
+        Soporta tanto el MultiIndex (ticker, campo) de yf.download con
+        group_by='ticker' como columnas planas cuando hay un solo ticker.
+        Todos los campos salen de un único reindex + to_numpy; cada matriz
+        es una vista de ese bloque, sin un DataFrame intermedio por campo.
+        
+        Returns:
+            Tupla (tickers presentes en los datos, dict campo -> matriz)
+        """
+        campos = ('Close', 'High', 'Low', 'Volume')
+        
+        if not isinstance(self.data.columns, pd.MultiIndex):
+            tickers = self.tickers[:1]
+            valores = self.data.reindex(columns=list(campos)).to_numpy(dtype=np.float32)
+            return tickers, {campo: valores[:, k:k + 1] for k, campo in enumerate(campos)}
+        
+        # Mismo orden que self.tickers; los que no se descargaron se omiten
+        disponibles = set(self.data.columns.get_level_values(0))
+        tickers = [t for t in self.tickers if t in disponibles]
+        columnas = pd.MultiIndex.from_product([tickers, campos])
+        valores = self.data.reindex(columns=columnas).to_numpy(dtype=np.float32)
+        valores = valores.reshape(len(self.data), len(tickers), len(campos))
+        return tickers, {campo: valores[:, :, k] for k, campo in enumerate(campos)}
+    
     def calculate_radar_metrics(self) -> pd.DataFrame:
         """
         Calcula métricas de escaneo vectorizadas (sin bucles)
         
+        Todas las ventanas móviles se calculan para la matriz completa
+        (barras × tickers) de una vez, en lugar de ticker por ticker.
+        
         Returns:
             DataFrame con métricas por ticker
         """
         print("\n🧮 Calculando métricas del radar...")
         
-        metrics = []
+        if self.data is None or len(self.data) < 50:
+            print(f"✅ Métricas calculadas para 0 activos")
+            return pd.DataFrame()
         
-        for ticker in self.tickers:
-            try:
-                # Extraer datos del ticker
-                if len(self.tickers) == 1:
-                    ticker_data = self.data
-                else:
-                    ticker_data = self.data[ticker]
-                
-                if ticker_data.empty or len(ticker_data) < 50:
-                    continue
-                
-                # Datos básicos
-                close = ticker_data['Close']
-                volume = ticker_data['Volume']
-                high = ticker_data['High']
-                low = ticker_data['Low']
-                
-                # Último precio
-                latest_close = close.iloc[-1]
-                prev_close = close.iloc[-2]
-                
-                # === FILTRO 1: VOLUMEN RELATIVO (RVOL) ===
-                avg_volume_20 = volume.rolling(20).mean().iloc[-1]
-                latest_volume = volume.iloc[-1]
-                rvol = latest_volume / avg_volume_20 if avg_volume_20 > 0 else 0
-                
-                # === FILTRO 2: MEDIAS MÓVILES ===
-                sma_20 = close.rolling(20).mean().iloc[-1]
-                sma_50 = close.rolling(50).mean().iloc[-1]
-                sma_200 = close.rolling(200).mean().iloc[-1] if len(close) >= 200 else np.nan
-                
-                # Cruce de medias (Golden Cross / Death Cross)
-                cross_signal = 0
-                if not np.isnan(sma_200):
-                    if sma_50 > sma_200 and close.rolling(50).mean().iloc[-2] <= close.rolling(200).mean().iloc[-2]:
-                        cross_signal = 1  # Golden Cross
-                    elif sma_50 < sma_200 and close.rolling(50).mean().iloc[-2] >= close.rolling(200).mean().iloc[-2]:
-                        cross_signal = -1  # Death Cross
-                
-                # === FILTRO 3: RUPTURA DE RANGO (BREAKOUT) ===
-                high_20 = high.rolling(20).max().iloc[-2]  # Máximo previo de 20 días
-                low_20 = low.rolling(20).min().iloc[-2]
-                
-                breakout_up = latest_close > high_20
-                breakout_down = latest_close < low_20
-                
-                # === FILTRO 4: MOMENTUM (RATE OF CHANGE) ===
-                roc_10 = ((latest_close - close.iloc[-11]) / close.iloc[-11] * 100) if len(close) > 10 else 0
-                
-                # === FILTRO 5: VOLATILIDAD (ATR RELATIVO) ===
-                tr = pd.DataFrame({
-                    'hl': high - low,
-                    'hc': abs(high - close.shift()),
-                    'lc': abs(low - close.shift())
-                }).max(axis=1)
-                atr_14 = tr.rolling(14).mean().iloc[-1]
-                atr_percent = (atr_14 / latest_close * 100) if latest_close > 0 else 0
-                
-                # Construir registro de métricas
-                metrics.append({
-                    'ticker': ticker,
-                    'price': latest_close,
-                    'price_change_pct': ((latest_close - prev_close) / prev_close * 100),
-                    'volume': latest_volume,
-                    'rvol': rvol,
-                    'sma_20': sma_20,
-                    'sma_50': sma_50,
-                    'sma_200': sma_200,
-                    'above_sma50': latest_close > sma_50,
-                    'above_sma200': latest_close > sma_200 if not np.isnan(sma_200) else False,
-                    'golden_cross': cross_signal == 1,
-                    'death_cross': cross_signal == -1,
-                    'breakout_up': breakout_up,
-                    'breakout_down': breakout_down,
-                    'roc_10d': roc_10,
-                    'atr_percent': atr_percent,
-                    'high_volume': rvol > 2.0,
-                    'strong_momentum': roc_10 > 5.0
-                })
-                
-            except Exception as e:
-                # Silenciar errores individuales para no interrumpir el escaneo
-                continue
+        # float32 basta para precios y volumen (solo se usan en medias y
+        # ratios) y reduce a la mitad los bytes de la pasada por ventanas
+        tickers, matrices = self._extraer_matrices()
+        close = matrices['Close']
+        high = matrices['High']
+        low = matrices['Low']
+        volume = matrices['Volume']
+        
+        # Todas las ventanas móviles en una sola pasada
+        ventanas = _metricas_ventanas(close, high, low, volume)
+        sma_20 = ventanas['sma_20']
+        sma_50 = ventanas['sma_50']
+        sma_200 = ventanas['sma_200']
+        
+        # Último precio
+        latest_close = close[-1]
+        prev_close = close[-2]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # === FILTRO 1: VOLUMEN RELATIVO (RVOL) ===
+            avg_volume_20 = ventanas['avg_volume_20']
+            latest_volume = volume[-1]
+            rvol = np.where(avg_volume_20 > 0, latest_volume / avg_volume_20, 0.0)
+            
+            # === FILTRO 2: MEDIAS MÓVILES ===
+            # Cruce de medias (Golden Cross / Death Cross), vectores booleanos por ticker
+            golden_cross = (sma_50 > sma_200) & (ventanas['sma_50_prev'] <= ventanas['sma_200_prev'])
+            death_cross = (sma_50 < sma_200) & (ventanas['sma_50_prev'] >= ventanas['sma_200_prev'])
+            
+            # === FILTRO 3: RUPTURA DE RANGO (BREAKOUT) ===
+            high_20 = ventanas['high_20']  # Máximo previo de 20 días
+            low_20 = ventanas['low_20']
+            
+            # === FILTRO 4: MOMENTUM (RATE OF CHANGE) ===
+            close_10 = close[-11]
+            roc_10 = (latest_close - close_10) / close_10 * 100
+            
+            # === FILTRO 5: VOLATILIDAD (ATR RELATIVO) ===
+            atr_percent = np.where(latest_close > 0, ventanas['atr_14'] / latest_close * 100, 0.0)
+            
+            price_change_pct = (latest_close - prev_close) / prev_close * 100
         
-        df_metrics = pd.DataFrame(metrics)
+        columnas = {
+            'price': latest_close,
+            'price_change_pct': price_change_pct,
+            'volume': latest_volume,
+            'rvol': rvol,
+            'sma_20': sma_20,
+            'sma_50': sma_50,
+            'sma_200': sma_200,
+            'above_sma50': latest_close > sma_50,
+            'above_sma200': latest_close > sma_200,
+            'golden_cross': golden_cross,
+            'death_cross': death_cross,
+            'breakout_up': latest_close > high_20,
+            'breakout_down': latest_close < low_20,
+            'roc_10d': roc_10,
+            'atr_percent': atr_percent,
+            'high_volume': rvol > 2.0,
+            'strong_momentum': roc_10 > 5.0
+        }
+        
+        # Una columna por array, ya con su dtype final (sin inferencia por fila)
+        df_metrics = pd.DataFrame({
+            'ticker': tickers,
+            **{nombre: np.asarray(columnas[nombre], dtype=dtype)
+               for nombre, dtype in DTYPES_METRICAS.items()}
+        })
         print(f"✅ Métricas calculadas para {len(df_metrics)} activos")
         
         return df_metrics
     
-    def apply_filters(self, df_metrics: pd.DataFrame, strategy: str = "momentum") -> List[str]:
+    def _mascara_estrategia(self, df_metrics: pd.DataFrame, strategy: str) -> np.ndarray:
         """
-        Aplica filtros estratégicos para identificar candidatos
+        Máscara booleana de las filas que pasan los filtros de la estrategia
         MEJORADO: Filtros más sensibles para detectar más oportunidades
         
         Args:
@@ -409,104 +711,137 @@ class MarketRadar:
             strategy: Estrategia de filtrado ('momentum', 'breakout', 'value', 'mixed')
         
         Returns:
-            Lista de tickers candidatos
+            Array bool, una posición por fila de df_metrics
         """
         print(f"\n🎯 Aplicando estrategia de filtrado: '{strategy.upper()}'")
         
+        # Columnas como arrays NumPy: las booleanas ya son máscaras
+        above_sma50 = df_metrics['above_sma50'].to_numpy(dtype=bool)
+        breakout_up = df_metrics['breakout_up'].to_numpy(dtype=bool)
+        golden_cross = df_metrics['golden_cross'].to_numpy(dtype=bool)
+        rvol = df_metrics['rvol'].to_numpy()
+        roc_10d = df_metrics['roc_10d'].to_numpy()
+        price_change_pct = df_metrics['price_change_pct'].to_numpy()
+        
         if strategy == "momentum":
             # Estrategia de Momentum MEJORADA: Más sensible
-            filtered = df_metrics[
-                (df_metrics['above_sma50'] == True) &  # Sobre media 50
-                (
-                    (df_metrics['roc_10d'] > 3.0) |  # Momentum moderado O
-                    (df_metrics['rvol'] > 1.5)       # Alto volumen relativo
-                )
-            ]
+            mask = above_sma50 & (      # Sobre media 50
+                (roc_10d > 3.0) |       # Momentum moderado O
+                (rvol > 1.5)            # Alto volumen relativo
+            )
             
         elif strategy == "breakout":
             # Estrategia de Ruptura MEJORADA: Menos restrictiva
-            filtered = df_metrics[
-                (
-                    (df_metrics['breakout_up'] == True) |  # Ruptura O
-                    (df_metrics['price_change_pct'] > 3.0)  # Cambio fuerte de precio
-                ) &
-                (df_metrics['rvol'] > 1.2)  # Volumen mínimo
-            ]
+            mask = (
+                breakout_up |               # Ruptura O
+                (price_change_pct > 3.0)    # Cambio fuerte de precio
+            ) & (rvol > 1.2)                # Volumen mínimo
             
         elif strategy == "golden_cross":
             # Estrategia de Cruce Dorado
-            filtered = df_metrics[
-                (df_metrics['golden_cross'] == True) &
-                (df_metrics['rvol'] > 1.0)
-            ]
+            mask = golden_cross & (rvol > 1.0)
             
         elif strategy == "value":
             # Estrategia de Valor MEJORADA: Busca reversiones
-            filtered = df_metrics[
-                (
-                    (df_metrics['above_sma50'] == False) &  # Debajo de media
-                    (df_metrics['roc_10d'] > -5.0) &         # No caída fuerte
-                    (df_metrics['roc_10d'] < 3.0)            # Comenzando a subir
-                ) |
-                (
-                    (df_metrics['above_sma50'] == True) &   # O sobre media
-                    (df_metrics['roc_10d'] > 0) &            # Momentum positivo
-                    (df_metrics['rvol'] > 1.3)               # Volumen
-                )
-            ]
+            mask = (
+                ~above_sma50 &          # Debajo de media
+                (roc_10d > -5.0) &      # No caída fuerte
+                (roc_10d < 3.0)         # Comenzando a subir
+            ) | (
+                above_sma50 &           # O sobre media
+                (roc_10d > 0) &         # Momentum positivo
+                (rvol > 1.3)            # Volumen
+            )
             
         elif strategy == "mixed":
             # Estrategia Mixta MEJORADA: Combina múltiples señales con menos restricciones
-            filtered = df_metrics[
-                (
-                    # Opción 1: Tendencia alcista con volumen
-                    ((df_metrics['above_sma50'] == True) & (df_metrics['rvol'] > 1.2)) |
-                    
-                    # Opción 2: Ruptura
-                    (df_metrics['breakout_up'] == True) |
-                    
-                    # Opción 3: Golden cross
-                    (df_metrics['golden_cross'] == True) |
-                    
-                    # Opción 4: Momentum fuerte
-                    ((df_metrics['roc_10d'] > 5.0) & (df_metrics['rvol'] > 1.0)) |
-                    
-                    # Opción 5: Cambio de precio significativo
-                    (df_metrics['price_change_pct'] > 3.0)
-                )
-            ]
+            mask = np.logical_or.reduce([
+                above_sma50 & (rvol > 1.2),          # Opción 1: Tendencia alcista con volumen
+                breakout_up,                         # Opción 2: Ruptura
+                golden_cross,                        # Opción 3: Golden cross
+                (roc_10d > 5.0) & (rvol > 1.0),      # Opción 4: Momentum fuerte
+                price_change_pct > 3.0               # Opción 5: Cambio de precio significativo
+            ])
             
         else:
             print(f"⚠️ Estrategia '{strategy}' no reconocida. Usando 'mixed'.")
-            return self.apply_filters(df_metrics, strategy="mixed")
+            return self._mascara_estrategia(df_metrics, strategy="mixed")
         
-        candidates = filtered['ticker'].tolist()
-        print(f"✅ {len(candidates)} candidatos identificados")
+        print(f"✅ {int(mask.sum())} candidatos identificados")
+        return mask
+    
+    def apply_filters(self, df_metrics: pd.DataFrame, strategy: str = "momentum") -> List[str]:
+        """
+        Aplica filtros estratégicos para identificar candidatos
+        MEJORADO: Filtros más sensibles para detectar más oportunidades
+        
+        Args:
+            df_metrics: DataFrame con métricas calculadas
+            strategy: Estrategia de filtrado ('momentum', 'breakout', 'value', 'mixed')
+        
+        Returns:
+            Lista de tickers candidatos, ordenados por score de ranking
+        """
+        mask = self._mascara_estrategia(df_metrics, strategy)
+        if not mask.any():
+            return []
         
         # Ordenar por fuerza (combinación de métricas)
-        if len(filtered) > 0:
-            # Sistema de scoring mejorado
-            filtered['score'] = (
-                filtered['rvol'] * 0.25 +                              # Volumen relativo
-                filtered['roc_10d'].clip(-10, 20) * 0.35 +             # ROC (limitado)
-                (filtered['above_sma50'].astype(int) * 8) +            # Sobre SMA 50
-                (filtered['above_sma200'].astype(int) * 12) +          # Sobre SMA 200
-                (filtered['breakout_up'].astype(int) * 15) +           # Ruptura
-                (filtered['golden_cross'].astype(int) * 20) +          # Golden Cross
-                (filtered['price_change_pct'].clip(-5, 10) * 0.5)      # Cambio de precio
-            )
-            filtered_sorted = filtered.sort_values('score', ascending=False)
-            candidates = filtered_sorted['ticker'].tolist()
-            
-            # Mostrar top candidatos
-            top_to_show = min(15, len(filtered_sorted))
-            print(f"\n🏆 Top {top_to_show} candidatos por score:")
-            for i, (idx, row) in enumerate(filtered_sorted.head(top_to_show).iterrows(), 1):
-                print(f"   {i:2}. {row['ticker']:8} | Score: {row['score']:6.2f} | "
-                      f"Precio: ${row['price']:8.2f} | RVOL: {row['rvol']:4.2f}x | "
-                      f"ROC: {row['roc_10d']:+6.2f}% | Cambio: {row['price_change_pct']:+5.2f}%")
+        filtered = df_metrics[mask]
+        score = (
+            filtered['rvol'].to_numpy() * 0.25 +                             # Volumen relativo
+            np.clip(filtered['roc_10d'].to_numpy(), -10, 20) * 0.35 +        # ROC (limitado)
+            filtered['above_sma50'].to_numpy(dtype=bool) * 8 +               # Sobre SMA 50
+            filtered['above_sma200'].to_numpy(dtype=bool) * 12 +             # Sobre SMA 200
+            filtered['breakout_up'].to_numpy(dtype=bool) * 15 +              # Ruptura
+            filtered['golden_cross'].to_numpy(dtype=bool) * 20 +             # Golden Cross
+            np.clip(filtered['price_change_pct'].to_numpy(), -5, 10) * 0.5   # Cambio de precio
+        )
+        filtered_sorted = filtered.assign(score=score).sort_values('score', ascending=False)
+        
+        # Mostrar top candidatos
+        top_to_show = min(15, len(filtered_sorted))
+        print(f"\n🏆 Top {top_to_show} candidatos por score:")
+        print(filtered_sorted.head(top_to_show)[
+            ['ticker', 'score', 'price', 'rvol', 'roc_10d', 'price_change_pct']
+        ].to_string(index=False, float_format='{:.2f}'.format))
         
-        return candidates
+        return filtered_sorted['ticker'].tolist()
+    
+    def _obtener_sentimiento(self) -> Dict:
+        """
+        Fear & Greed del universo, memoizado por día entre escaneos
+        
+        Solo la primera consulta del día va a la red; los valores de
+        respaldo (fuente 'fallback') no se memoizan para reintentar.
+        
+        Returns:
+            {'value': int, 'classification': str, ...}
+        """
+        tipo = 'crypto' if 'crypto' in self.universe.lower() else 'stocks'
+        hoy = date.today().isoformat()
+        sentiment = _SENTIMIENTO_DIARIO.get((tipo, hoy))
+        if sentiment is not None:
+            return sentiment
+        
+        # Para crypto, usar sentimiento crypto
+        if tipo == 'crypto':
+            sentiment = self.sentiment_analyzer.get_fear_greed_crypto()
+        else:
+            # Para stocks, intentar sentimiento stocks (puede fallar por anti-bot)
+            try:
+                sentiment = self.sentiment_analyzer.get_fear_greed_stocks()
+            except Exception:
+                # Fallback a crypto como proxy general
+                sentiment = self.sentiment_analyzer.get_fear_greed_crypto()
+        
+        if sentiment.get('source') != 'fallback':
+            # Descartar los días anteriores
+            for clave in [c for c in _SENTIMIENTO_DIARIO if c[1] != hoy]:
+                del _SENTIMIENTO_DIARIO[clave]
+            _SENTIMIENTO_DIARIO[(tipo, hoy)] = sentiment
+        
+        return sentiment
     
     def calculate_candidate_score(self, df_metrics: pd.DataFrame) -> pd.DataFrame:
         """
@@ -527,17 +862,7 @@ class MarketRadar:
         
         if self.sentiment_analyzer:
             try:
-                # Para crypto, usar sentimiento crypto
-                if 'crypto' in self.universe.lower():
-                    sentiment = self.sentiment_analyzer.get_fear_greed_crypto()
-                else:
-                    # Para stocks, intentar sentimiento stocks (puede fallar por anti-bot)
-                    try:
-                        sentiment = self.sentiment_analyzer.get_fear_greed_stocks()
-                    except:
-                        # Fallback a crypto como proxy general
-                        sentiment = self.sentiment_analyzer.get_fear_greed_crypto()
-                
+                sentiment = self._obtener_sentimiento()
                 sentiment_value = sentiment['value']
                 sentiment_class = sentiment['classification']
                 sentiment_info = f"{sentiment_value} ({sentiment_class})"
@@ -562,48 +887,20 @@ class MarketRadar:
                 print(f"   ⚠️ No se pudo obtener sentimiento: {e}")
         
         # === CÁLCULO DE SCORE BASE (0-90 puntos) ===
-        df_metrics['score_base'] = 0.0
-        
-        # MOMENTUM (0-25 puntos)
-        df_metrics['score_momentum'] = df_metrics['roc_10d'].clip(-10, 25) * 0.7
-        
-        # VOLUMEN (0-15 puntos)
-        df_metrics['score_volume'] = (df_metrics['rvol'] - 1).clip(0, 5) * 3
-        
-        # TENDENCIA (0-20 puntos)
-        df_metrics['score_trend'] = (
-            df_metrics['above_sma50'].astype(int) * 10 +
-            df_metrics['above_sma200'].astype(int) * 10
-        )
-        
-        # SEÑALES ESPECIALES (0-30 puntos)
-        df_metrics['score_signals'] = (
-            df_metrics['breakout_up'].astype(int) * 15 +
-            df_metrics['golden_cross'].astype(int) * 15
-        )
-        
-        # Score base
-        df_metrics['score_base'] = (
-            df_metrics['score_momentum'] +
-            df_metrics['score_volume'] +
-            df_metrics['score_trend'] +
-            df_metrics['score_signals']
-        ).clip(0, 90)
+        for nombre, valores in _puntuar_candidatos(df_metrics).items():
+            df_metrics[nombre] = valores
         
         # === APLICAR AJUSTE DE SENTIMIENTO ===
         df_metrics['score'] = (df_metrics['score_base'] + sentiment_boost).clip(0, 100)
         
         # === CLASIFICAR POR CONFIANZA ===
-        df_metrics['confianza'] = pd.cut(
-            df_metrics['score'],
-            bins=[0, 50, 70, 100],
-            labels=['BAJA', 'MEDIA', 'ALTA']
-        )
+        codigos = _codigo_confianza(df_metrics['score'].to_numpy())
+        df_metrics['confianza_code'] = codigos
         
         # Mostrar distribución
         print(f"\n   Distribución de confianza:")
-        confianza_counts = df_metrics['confianza'].value_counts().sort_index()
-        for nivel, count in confianza_counts.items():
+        confianza_counts = np.bincount(codigos[codigos >= 0], minlength=len(NIVELES_CONFIANZA))
+        for nivel, count in zip(NIVELES_CONFIANZA, confianza_counts):
             print(f"     {nivel}: {count} candidatos")
         
         return df_metrics
@@ -649,11 +946,11 @@ class MarketRadar:
             return [], df_metrics
         
         # Paso 4: Aplicar filtros
-        candidates_list = self.apply_filters(df_metrics, strategy=strategy)
+        mask = self._mascara_estrategia(df_metrics, strategy)
         
         # === PASO 5: CALCULAR SCORES (NUEVO v5.0) ===
-        # Filtrar solo candidatos que pasaron los filtros
-        df_candidates = df_metrics[df_metrics['ticker'].isin(candidates_list)].copy()
+        # Solo los candidatos que pasaron los filtros; el score se calcula una vez
+        df_candidates = df_metrics[mask].copy()
         
         if not df_candidates.empty:
             df_candidates = self.calculate_candidate_score(df_candidates)
@@ -664,17 +961,18 @@ class MarketRadar:
             
             # Mostrar top candidatos con score
             print(f"\n🏆 Top {min(10, len(df_candidates))} candidatos con mejor score:")
-            for i, (idx, row) in enumerate(df_candidates.head(10).iterrows(), 1):
-                print(f"   {i:2}. {row['ticker']:8} | Score: {row['score']:5.1f} | "
-                      f"Confianza: {row['confianza']:5} | "
-                      f"Precio: ${row['price']:8.2f} | ROC: {row['roc_10d']:+6.2f}%")
+            for i, row in enumerate(df_candidates.head(10).itertuples(index=False), 1):
+                print(f"   {i:2}. {row.ticker:8} | Score: {row.score:5.1f} | "
+                      f"Confianza: {_etiqueta_confianza(row.confianza_code):5} | "
+                      f"Precio: ${row.price:8.2f} | ROC: {row.roc_10d:+6.2f}%")
             
             # Actualizar df_metrics con scores (para export)
             df_metrics = df_metrics.merge(
-                df_candidates[['ticker', 'score', 'confianza']], 
+                df_candidates[['ticker', 'score', 'confianza_code']], 
                 on='ticker', 
                 how='left'
             )
+            df_metrics['confianza_code'] = df_metrics['confianza_code'].fillna(-1).astype(np.int8)
         else:
             candidates = []
         
@@ -688,15 +986,22 @@ class MarketRadar:
     
     def export_radar_results(self, df_metrics: pd.DataFrame, universe: str):
         """
-        Exporta resultados del radar a CSV con nombre fijo (sin timestamp)
+        Exporta resultados del radar con nombre fijo (sin timestamp) junto
+        a este módulo
+        
+        Usa Parquet (Snappy, columnas tipadas) si hay motor disponible; si
+        no, CSV.
         
         Args:
             df_metrics: DataFrame con métricas
             universe: Universo escaneado (sp500, crypto, etc)
         """
-        filename = f"radar_{universe}.csv"  # Nombre fijo
-        filepath = f"c:/Users/mikia/analisis-tecnico/{filename}"
-        df_metrics.to_csv(filepath, index=False)
+        if PARQUET_AVAILABLE:
+            filename = f"radar_{universe}.parquet"  # Nombre fijo
+            df_metrics.to_parquet(Path(__file__).parent / filename, compression='snappy', index=False)
+        else:
+            filename = f"radar_{universe}.csv"
+            df_metrics.to_csv(Path(__file__).parent / filename, index=False)
         print(f"📁 Resultados del radar exportados a: {filename}")
 
 
@@ -711,7 +1016,7 @@ def main():
         strategy="momentum",
         max_candidates=15
     )
-    radar_sp500.export_radar_results(metrics, "radar_sp500_momentum.csv")
+    radar_sp500.export_radar_results(metrics, "sp500_momentum")
     
     print(f"\n📊 Candidatos de momentum del S&P 500:")
     for i, ticker in enumerate(candidates_momentum, 1):
@@ -725,7 +1030,7 @@ def main():
         strategy="breakout",
         max_candidates=10
     )
-    radar_crypto.export_radar_results(metrics_crypto, "radar_crypto_breakout.csv")
+    radar_crypto.export_radar_results(metrics_crypto, "crypto_breakout")
     
     print(f"\n📊 Candidatos de breakout en Crypto:")
     for i, ticker in enumerate(candidates_breakout, 1):
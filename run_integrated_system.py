@@ -15,32 +15,68 @@ import sys
 import os
 
 # Configurar encoding UTF-8 para el stdout (Windows compatibility)
-if sys.platform == 'win32':
-    import codecs
-    # Solo reconfigurar si stdout tiene buffer (no es ya un TextIOWrapper)
-    if hasattr(sys.stdout, 'buffer'):
-        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    if hasattr(sys.stderr, 'buffer'):
-        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
-
-from svga_system import SVGASystem
+from _consola import configurar_utf8
+configurar_utf8()
+
+from svga_system import SVGASystem, EMOJI_RECOMENDACION
 from market_radar import MarketRadar
 from tactical_radars import TacticalRadarSystem
 from alertas_avanzadas import DetectorAlertasAvanzadas
-import json
 import pandas as pd
 import time
-import traceback
+import signal
+import threading
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Optional
+from functools import lru_cache
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+# Métricas que usa el resumen ejecutivo y su valor por defecto si la clave falta
+# (las de volumen y precio quedan en NaN: sin ellas no hay alerta)
+COLUMNAS_RESUMEN = ['ema_50', 'ema_200', 'macd_histogram', 'adx', 'rsi',
+                    'volume', 'volume_sma_20', 'close', 'close_prev']
+DEFECTOS_RESUMEN = {'ema_50': 0.0, 'ema_200': 0.0, 'macd_histogram': 0.0, 'adx': 0.0, 'rsi': 50.0}
+
+# Separador de las cabeceras de fase
+_BANNER = "=" * 80
+
+# Directorio de los radar_*.csv (junto a este script), resuelto una sola vez
+RADAR_DIR = Path(__file__).resolve().parent
+
+# Etiquetas indexadas por código int8 de categoría
+ETIQUETAS_TENDENCIA = np.array(["BAJISTA", "ALCISTA"])               # EMA 50 > EMA 200
+ETIQUETAS_MOMENTUM = np.array(["NEGATIVO", "POSITIVO"])              # Histograma MACD > 0
+ETIQUETAS_FUERZA = np.array(["DÉBIL", "MODERADA", "FUERTE"])         # ADX ≤25 / >25 / >40
+ETIQUETAS_RSI = np.array(["SOBREVENTA", "NEUTRAL", "SOBRECOMPRA"])  # RSI <30 / 30-70 / >70
+
+
+def _seccion(titulo: str, final: str = "\n"):
+    """Imprime una cabecera de fase (título entre separadores) en un solo print"""
+    print(f"\n{_BANNER}\n{titulo}\n{_BANNER}{final}", flush=True)
 
 
-def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
+@lru_cache(maxsize=1)
+def _get_detector() -> DetectorAlertasAvanzadas:
+    """Detector de alertas compartido entre ejecuciones (reinicia su estado en cada detección)"""
+    return DetectorAlertasAvanzadas()
+
+
+def generar_resumen_ejecutivo(datos_completos: Dict, ts: Optional[str] = None) -> Dict:
     """
     Genera resumen ejecutivo con análisis avanzado de alertas
     
     Args:
         datos_completos: Diccionario con todos los análisis realizados
+        ts: Marca de tiempo ISO del análisis (por defecto, la hora actual)
     
     Returns:
         Dict con resumen ejecutivo estructurado
@@ -48,7 +84,7 @@ def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
     print("\n Generando resumen ejecutivo...", flush=True)
     
     resumen = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": ts or datetime.now().isoformat(),
         "distribucion_senales": {},
         "alertas_alta_prioridad": [],
         "alertas_media_prioridad": [],
@@ -63,7 +99,7 @@ def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
     # === INTEGRAR DETECTOR DE ALERTAS AVANZADAS ===
     try:
         print("🔍 Ejecutando detector de alertas avanzadas...", flush=True)
-        detector = DetectorAlertasAvanzadas()
+        detector = _get_detector()
         alertas_avanzadas = detector.detectar_todas_alertas(datos_completos)
         
         resumen['anomalias'] = alertas_avanzadas['anomalias']
@@ -96,107 +132,149 @@ def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
     if not todos_activos:
         return resumen
     
-    # === 1. DISTRIBUCIÓN DE SEÑALES ===
-    senales = {'COMPRAR': 0, 'VENDER': 0, 'MANTENER': 0}
+    # === RECORRIDO ÚNICO DE LOS ACTIVOS ===
+    # Señales, alertas y métricas se leen en la misma pasada
+    recomendaciones = []
+    metricas = {}
+    senales_con_metricas = []  # Señales (o None) de cada activo con métricas
+    destino_alertas = {
+        'HIGH': resumen['alertas_alta_prioridad'],
+        'MEDIUM': resumen['alertas_media_prioridad']
+    }
+    
     for ticker, data in todos_activos.items():
-        if 'signals' in data:
-            signal = data['signals'].get('recommendation', 'MANTENER')
-            senales[signal] = senales.get(signal, 0) + 1
+        sig = data.get('signals')
+        met = data.get('latest_metrics')
+        
+        if sig is not None:
+            # === 1. DISTRIBUCIÓN DE SEÑALES ===
+            recomendaciones.append(sig.get('recommendation', 'MANTENER'))
+            
+            # === 2. ALERTAS DE ALTA Y MEDIA PRIORIDAD ===
+            # Cada alerta va directa a su lista; las de baja prioridad se descartan
+            for alert in sig.get('alerts', []):
+                prioridad = alert['priority']
+                lista = destino_alertas.get(prioridad)
+                if lista is not None:
+                    lista.append({
+                        'ticker': ticker,
+                        'tipo': alert['type'],
+                        'descripcion': alert['description'],
+                        'prioridad': prioridad
+                    })
+        
+        if met is not None:
+            metricas[ticker] = met
+            senales_con_metricas.append(sig)
     
+    # Conteo en C con Counter; las tres señales estándar siempre presentes
+    senales = {'COMPRAR': 0, 'VENDER': 0, 'MANTENER': 0}
+    senales.update(Counter(recomendaciones))
     resumen['distribucion_senales'] = senales
     
-    # === 2. ALERTAS DE ALTA Y MEDIA PRIORIDAD ===
-    for ticker, data in todos_activos.items():
-        if 'signals' in data:
-            for alert in data['signals'].get('alerts', []):
-                alerta_info = {
-                    'ticker': ticker,
-                    'tipo': alert['type'],
-                    'descripcion': alert['description'],
-                    'prioridad': alert['priority']
-                }
-                
-                if alert['priority'] == 'HIGH':
-                    resumen['alertas_alta_prioridad'].append(alerta_info)
-                elif alert['priority'] == 'MEDIUM':
-                    resumen['alertas_media_prioridad'].append(alerta_info)
+    # === TABLA COLUMNAR DE MÉTRICAS ===
+    # Una fila por activo con métricas; las columnas derivadas (tendencia,
+    # momentum, fuerza, RSI, RVOL, cambio %) se calculan vectorizadas
+    # Los defectos solo cubren claves ausentes: un valor presente pero NaN
+    # sigue siendo NaN (y ninguna comparación con él es cierta)
+    df = pd.DataFrame([{**DEFECTOS_RESUMEN, **met} for met in metricas.values()],
+                      index=list(metricas), columns=COLUMNAS_RESUMEN, dtype=float)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rvol = np.where(df['volume_sma_20'] > 0, df['volume'] / df['volume_sma_20'], 0.0)
+        cambio_pct = ((df['close'] - df['close_prev']) / df['close_prev'] * 100).to_numpy()
     
     # === 3. MÉTRICAS TÉCNICAS CLAVE ===
-    for ticker, data in todos_activos.items():
-        if 'latest_metrics' in data and 'signals' in data:
-            metrics = data['latest_metrics']
-            signals = data['signals']
-            
-            # Tendencia
-            tendencia = "ALCISTA" if metrics.get('ema_50', 0) > metrics.get('ema_200', 0) else "BAJISTA"
-            
-            # Momentum
-            macd_hist = metrics.get('macd_histogram', 0)
-            momentum = "POSITIVO" if macd_hist > 0 else "NEGATIVO"
-            
-            # Fuerza
-            adx = metrics.get('adx', 0)
-            fuerza = "FUERTE" if adx > 40 else "MODERADA" if adx > 25 else "DÉBIL"
-            
-            # Estado RSI
-            rsi = metrics.get('rsi', 50)
-            estado_rsi = "SOBRECOMPRA" if rsi > 70 else "SOBREVENTA" if rsi < 30 else "NEUTRAL"
-            
-            resumen['metricas_tecnicas'][ticker] = {
-                'precio': signals.get('price_current', 0),
-                'senal': signals.get('recommendation', 'MANTENER'),
-                'tendencia': tendencia,
-                'momentum': momentum,
-                'fuerza_tendencia': fuerza,
-                'adx': adx,
-                'rsi': rsi,
-                'estado_rsi': estado_rsi,
-                'macd_histogram': macd_hist
-            }
+    # Solo los activos con señales llegan al resumen: se clasifican esas filas.
+    # Los umbrales dan códigos int8 (sumas de comparaciones, sin ramas) que
+    # se decodifican indexando la tabla de etiquetas
+    con_senal = np.array([s is not None for s in senales_con_metricas], dtype=bool)
+    tecnicas = df.loc[con_senal]
+    senales_tecnicas = [s for s in senales_con_metricas if s is not None]
+    valores_adx = tecnicas['adx'].to_numpy()
+    valores_rsi = tecnicas['rsi'].to_numpy()
+    codigo_fuerza = (valores_adx > 25).astype(np.int8) + (valores_adx > 40)
+    codigo_rsi = 1 + (valores_rsi > 70).astype(np.int8) - (valores_rsi < 30)
+    
+    valores_macd = tecnicas['macd_histogram'].to_numpy()
+    codigo_tendencia = (tecnicas['ema_50'].to_numpy() > tecnicas['ema_200'].to_numpy()).astype(np.int8)
+    codigo_momentum = (valores_macd > 0).astype(np.int8)
+    
+    tendencia = ETIQUETAS_TENDENCIA[codigo_tendencia].tolist()
+    momentum = ETIQUETAS_MOMENTUM[codigo_momentum].tolist()
+    fuerza = ETIQUETAS_FUERZA[codigo_fuerza].tolist()
+    estado_rsi = ETIQUETAS_RSI[codigo_rsi].tolist()
+    adx = valores_adx.tolist()
+    rsi = valores_rsi.tolist()
+    macd_hist = valores_macd.tolist()
+    
+    precios = [signals.get('price_current', 0) for signals in senales_tecnicas]
+    senal = [signals.get('recommendation', 'MANTENER') for signals in senales_tecnicas]
+    
+    # Un literal por activo recorriendo las columnas en paralelo (sin
+    # indexar nueve listas por fila)
+    resumen['metricas_tecnicas'].update({
+        ticker: {
+            'precio': p,
+            'senal': sn,
+            'tendencia': te,
+            'momentum': mo,
+            'fuerza_tendencia': fu,
+            'adx': ad,
+            'rsi': r,
+            'estado_rsi': er,
+            'macd_histogram': mh
+        }
+        for ticker, p, sn, te, mo, fu, ad, r, er, mh in zip(
+            tecnicas.index, precios, senal, tendencia, momentum, fuerza, adx, rsi, estado_rsi, macd_hist)
+    })
     
     # === 4. DETECCIÓN DE CAMBIOS ABRUPTOS ===
-    for ticker, data in todos_activos.items():
-        if 'latest_metrics' in data:
-            metrics = data['latest_metrics']
-            
-            # Volumen extremo
-            if 'volume' in metrics and 'volume_sma_20' in metrics:
-                rvol = metrics['volume'] / metrics['volume_sma_20'] if metrics['volume_sma_20'] > 0 else 0
-                if rvol > 5.0:
-                    resumen['cambios_abruptos'].append({
-                        'ticker': ticker,
-                        'tipo': 'VOLUMEN_EXTREMO',
-                        'descripcion': f"Volumen {rvol:.1f}x superior al promedio - Posible evento significativo",
-                        'severidad': 'ALTA'
-                    })
-            
-            # RSI extremo
-            rsi = metrics.get('rsi', 50)
-            if rsi > 80:
-                resumen['cambios_abruptos'].append({
-                    'ticker': ticker,
-                    'tipo': 'RSI_SOBRECOMPRA_EXTREMA',
-                    'descripcion': f"RSI en {rsi:.1f} - Sobreventa extrema, posible reversión inminente",
-                    'severidad': 'MEDIA'
-                })
-            elif rsi < 20:
-                resumen['cambios_abruptos'].append({
-                    'ticker': ticker,
-                    'tipo': 'RSI_SOBREVENTA_EXTREMA',
-                    'descripcion': f"RSI en {rsi:.1f} - Sobrecompra extrema, posible reversión al alza",
-                    'severidad': 'MEDIA'
-                })
-            
-            # Cambio de precio abrupto
-            if 'close' in metrics and 'close_prev' in metrics:
-                cambio_pct = ((metrics['close'] - metrics['close_prev']) / metrics['close_prev'] * 100)
-                if abs(cambio_pct) > 10:
-                    resumen['cambios_abruptos'].append({
-                        'ticker': ticker,
-                        'tipo': 'CAMBIO_PRECIO_ABRUPTO',
-                        'descripcion': f"Cambio de precio de {cambio_pct:+.2f}% en última sesión",
-                        'severidad': 'ALTA' if abs(cambio_pct) > 15 else 'MEDIA'
-                    })
+    volumen_extremo = rvol > 5.0              # Volumen extremo
+    rsi_activos = df['rsi'].to_numpy()
+    rsi_alto = rsi_activos > 80               # RSI extremo
+    rsi_bajo = rsi_activos < 20
+    precio_abrupto = np.abs(cambio_pct) > 10  # Cambio de precio abrupto
+    
+    # Los de severidad ALTA se cuentan al insertarlos (sección 5)
+    cambios_alta = 0
+    
+    # Solo se recorren los activos con algún cambio, en el orden original
+    for i in np.flatnonzero(volumen_extremo | rsi_alto | rsi_bajo | precio_abrupto):
+        ticker = df.index[i]
+        if volumen_extremo[i]:
+            resumen['cambios_abruptos'].append({
+                'ticker': ticker,
+                'tipo': 'VOLUMEN_EXTREMO',
+                'descripcion': f"Volumen {rvol[i]:.1f}x superior al promedio - Posible evento significativo",
+                'severidad': 'ALTA'
+            })
+            cambios_alta += 1
+        
+        if rsi_alto[i]:
+            resumen['cambios_abruptos'].append({
+                'ticker': ticker,
+                'tipo': 'RSI_SOBRECOMPRA_EXTREMA',
+                'descripcion': f"RSI en {rsi_activos[i]:.1f} - Sobreventa extrema, posible reversión inminente",
+                'severidad': 'MEDIA'
+            })
+        elif rsi_bajo[i]:
+            resumen['cambios_abruptos'].append({
+                'ticker': ticker,
+                'tipo': 'RSI_SOBREVENTA_EXTREMA',
+                'descripcion': f"RSI en {rsi_activos[i]:.1f} - Sobrecompra extrema, posible reversión al alza",
+                'severidad': 'MEDIA'
+            })
+        
+        if precio_abrupto[i]:
+            severidad = 'ALTA' if abs(cambio_pct[i]) > 15 else 'MEDIA'
+            resumen['cambios_abruptos'].append({
+                'ticker': ticker,
+                'tipo': 'CAMBIO_PRECIO_ABRUPTO',
+                'descripcion': f"Cambio de precio de {cambio_pct[i]:+.2f}% en última sesión",
+                'severidad': severidad
+            })
+            cambios_alta += severidad == 'ALTA'
     
     # === 5. RECOMENDACIONES ESTRATÉGICAS ===
     total_activos = len(todos_activos)
@@ -230,14 +308,12 @@ def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
         })
     
     # Recomendación por cambios abruptos
-    if len(resumen['cambios_abruptos']) > 0:
-        cambios_alta = sum(1 for c in resumen['cambios_abruptos'] if c['severidad'] == 'ALTA')
-        if cambios_alta > 0:
-            resumen['recomendaciones'].append({
-                'tipo': 'VIGILANCIA_VOLATILIDAD',
-                'mensaje': f"📈 {cambios_alta} activos muestran cambios abruptos de alta severidad. Ajustar stops.",
-                'prioridad': 'ALTA'
-            })
+    if cambios_alta > 0:
+        resumen['recomendaciones'].append({
+            'tipo': 'VIGILANCIA_VOLATILIDAD',
+            'mensaje': f"📈 {cambios_alta} activos muestran cambios abruptos de alta severidad. Ajustar stops.",
+            'prioridad': 'ALTA'
+        })
     
     # === 6. CONTEXTO DE MERCADO ===
     radar_info = {}
@@ -266,6 +342,71 @@ def generar_resumen_ejecutivo(datos_completos: Dict) -> Dict:
     return resumen
 
 
+def _exportar_csv(df: pd.DataFrame, archivo: Path):
+    """
+    Escribe un DataFrame a CSV (pensado para ejecutarse en segundo plano)
+    
+    Con Polars instalado se usa su escritor nativo, mucho más rápido que
+    DataFrame.to_csv en miles de filas × decenas de columnas; si no está
+    disponible (o no puede convertir alguna columna) se usa pandas.
+    """
+    try:
+        if POLARS_AVAILABLE:
+            try:
+                pl.from_pandas(df).write_csv(archivo)
+            except (pl.exceptions.PolarsError, ImportError, TypeError, ValueError):
+                df.to_csv(archivo, index=False)
+        else:
+            df.to_csv(archivo, index=False)
+        print(f"📁 Resultados exportados: {archivo.name}", flush=True)
+    except OSError as e:
+        print(f" Error exportando {archivo.name}: {e}", flush=True)
+
+
+def _escanear_radar_tactico(universe: str, benchmark: str, period: str,
+                            archivo_csv: str, max_candidates: int,
+                            escritor: ThreadPoolExecutor) -> Dict:
+    """
+    Ejecuta un radar táctico completo: carga del universo, escaneo y
+    exportación de métricas a CSV
+    
+    Args:
+        universe: Universo de MarketRadar (sp500, crypto30, ...)
+        benchmark: Benchmark del régimen de mercado
+        period: Período de datos
+        archivo_csv: Archivo (en RADAR_DIR) donde exportar las métricas completas
+        max_candidates: Número máximo de candidatos
+        escritor: Executor donde se encola la escritura del CSV
+    
+    Returns:
+        Dict con total_escaneados, candidatos, radars_used, regime y regime_signal
+    """
+    # Obtener universo
+    radar_temp = MarketRadar(universe=universe)
+    radar_temp.load_universe()
+    tickers = radar_temp.tickers
+    
+    # Ejecutar sistema táctico
+    tactical = TacticalRadarSystem(benchmark=benchmark)
+    candidatos, full_metrics, radars_used = tactical.run_tactical_scan(
+        tickers=tickers,
+        period=period,
+        max_candidates=max_candidates
+    )
+    
+    # Exportar resultados en segundo plano: el escaneo devuelve sin esperar al disco
+    if not full_metrics.empty:
+        escritor.submit(_exportar_csv, full_metrics, RADAR_DIR / archivo_csv)
+    
+    return {
+        'total_escaneados': len(tickers),
+        'candidatos': candidatos,
+        'radars_used': radars_used,
+        'regime': tactical.market_regime,
+        'regime_signal': tactical.regime_signal
+    }
+
+
 def run_integrated_analysis(
     portfolio_tickers: list,
     crypto_tickers: list,
@@ -291,11 +432,11 @@ def run_integrated_analysis(
         Dict con análisis completo y resumen ejecutivo
     """
     
-    print("\n" + "="*80, flush=True)
-    print("🚀 SISTEMA INTEGRADO SVGA 3.0 - ANÁLISIS COMPLETO AUTOMATIZADO", flush=True)
-    print("="*80 + "\n", flush=True)
+    _seccion("🚀 SISTEMA INTEGRADO SVGA 3.0 - ANÁLISIS COMPLETO AUTOMATIZADO")
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Una sola lectura del reloj para todo el análisis
+    inicio = datetime.now()
+    timestamp = inicio.strftime("%Y%m%d_%H%M%S")
     datos_completos = {
         "timestamp": timestamp,
         "portfolio": {},  # Portfolio único (stocks + crypto)
@@ -319,79 +460,43 @@ def run_integrated_analysis(
     if use_tactical_system:
         print("🎯 USANDO SISTEMA DE RADARES TÁCTICOS CON FLUJO DE 3 FASES\n", flush=True)
         
-        # === FASE 1A: RADARES TÁCTICOS PARA S&P 500 ===
-        if scan_sp500:
-            print(f"📡 FASE 1A: Radares Tácticos S&P 500...\n", flush=True)
-            
-            # Obtener universo S&P 500
-            radar_temp = MarketRadar(universe="sp500")
-            radar_temp.load_universe()
-            sp500_universe = radar_temp.tickers
-            
-            # Ejecutar sistema táctico
-            tactical_sp500 = TacticalRadarSystem(benchmark="^GSPC")
-            sp500_candidates, sp500_full_metrics, sp500_radars_used = tactical_sp500.run_tactical_scan(
-                tickers=sp500_universe,
-                period="6mo",
-                max_candidates=max_candidates
-            )
-            
-            datos_completos['radar_sp500'] = {
-                'total_escaneados': len(sp500_universe),
-                'candidatos': sp500_candidates,
-                'estrategia': 'TACTICAL',
-                'regime': tactical_sp500.market_regime,
-                'regime_signal': tactical_sp500.regime_signal,
-                'radars_used': sp500_radars_used
-            }
-            
-            tactical_info['sp500'] = {
-                'regime': tactical_sp500.market_regime,
-                'signal': tactical_sp500.regime_signal,
-                'radars': sp500_radars_used
-            }
-            
-            # Exportar resultados
-            if not sp500_full_metrics.empty:
-                sp500_full_metrics.to_csv('radar_sp500.csv', index=False)
-                print(f"📁 Resultados exportados: radar_sp500.csv", flush=True)
+        # === FASE 1A/1B: RADARES TÁCTICOS S&P 500 Y CRYPTO ===
+        # Uno tras otro: yf.download no es seguro entre hilos (comparte los
+        # diccionarios globales de yfinance.shared) y dos escaneos a la vez
+        # podrían mezclar sus descargas. Solo el CSV se escribe en segundo
+        # plano, mientras corre el escaneo siguiente; el with lo espera
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=1) as escritor:
+            if scan_sp500:
+                print(f"📡 FASE 1A: Radares Tácticos S&P 500...\n", flush=True)
+                resultados['sp500'] = _escanear_radar_tactico(
+                    "sp500", "^GSPC", "6mo", 'radar_sp500.csv', max_candidates, escritor)
+            if scan_crypto:
+                # Crypto usa BTC-USD como benchmark
+                print(f"📡 FASE 1B: Radares Tácticos Crypto Top 30...\n", flush=True)
+                resultados['crypto'] = _escanear_radar_tactico(
+                    "crypto30", "BTC-USD", "3mo", 'radar_crypto.csv', max_candidates, escritor)
         
-        # === FASE 1B: RADARES TÁCTICOS PARA CRYPTO ===
-        if scan_crypto:
-            print(f"\n📡 FASE 1B: Radares Tácticos Crypto Top 30...\n", flush=True)
-            
-            # Obtener universo crypto
-            radar_temp_crypto = MarketRadar(universe="crypto30")
-            radar_temp_crypto.load_universe()
-            crypto_universe = radar_temp_crypto.tickers
-            
-            # Ejecutar sistema táctico (usando BTC-USD como benchmark crypto)
-            tactical_crypto = TacticalRadarSystem(benchmark="BTC-USD")
-            crypto_candidates, crypto_full_metrics, crypto_radars_used = tactical_crypto.run_tactical_scan(
-                tickers=crypto_universe,
-                period="3mo",
-                max_candidates=max_candidates
-            )
-            
-            datos_completos['radar_crypto'] = {
-                'total_escaneados': len(crypto_universe),
-                'candidatos': crypto_candidates,
+        for clave, resultado in resultados.items():
+            datos_completos[f'radar_{clave}'] = {
+                'total_escaneados': resultado['total_escaneados'],
+                'candidatos': resultado['candidatos'],
                 'estrategia': 'TACTICAL',
-                'regime': tactical_crypto.market_regime,
-                'regime_signal': tactical_crypto.regime_signal,
-                'radars_used': crypto_radars_used
+                'regime': resultado['regime'],
+                'regime_signal': resultado['regime_signal'],
+                'radars_used': resultado['radars_used']
             }
             
-            tactical_info['crypto'] = {
-                'regime': tactical_crypto.market_regime,
-                'signal': tactical_crypto.regime_signal,
-                'radars': crypto_radars_used
+            tactical_info[clave] = {
+                'regime': resultado['regime'],
+                'signal': resultado['regime_signal'],
+                'radars': resultado['radars_used']
             }
-            
-            # Exportar resultados
-            if not crypto_full_metrics.empty:
-                crypto_full_metrics.to_csv('radar_crypto.csv', index=False)
-                print(f"📁 Resultados exportados: radar_crypto.csv", flush=True)
+        
+        if 'sp500' in resultados:
+            sp500_candidates = resultados['sp500']['candidatos']
+        if 'crypto' in resultados:
+            crypto_candidates = resultados['crypto']['candidatos']
     
     else:
         # OPCIÓN B: Usar sistema antiguo de radares
@@ -437,9 +542,7 @@ def run_integrated_analysis(
     # FASE 2A: ANÁLISIS PROFUNDO PORTFOLIO ÚNICO
     # ==================================================================
     
-    print("\n" + "="*80, flush=True)
-    print("🔬 FASE 2: Análisis Profundo del Portfolio Único", flush=True)
-    print("="*80 + "\n", flush=True)
+    _seccion("🔬 FASE 2: Análisis Profundo del Portfolio Único")
     
     print(f" Portfolio Completo: {portfolio_tickers}", flush=True)
     
@@ -454,22 +557,12 @@ def run_integrated_analysis(
     )
     
     # Ejecutar análisis (genera 4 archivos: portfolio_*.json, portfolio_*.md, mercado_*.json, mercado_*.md)
-    svga_system.run()
+    # Los resultados se toman de memoria; los archivos quedan para otros consumidores
+    portfolio_results, market_results = svga_system.run()
+    datos_completos['portfolio'] = portfolio_results
     
-    # Cargar resultados de los JSON generados
-    try:
-        with open('portfolio_analisis.json', 'r', encoding='utf-8') as f:
-            portfolio_data = json.load(f)
-            datos_completos['portfolio'] = portfolio_data.get('portfolio', {})
-    except Exception as e:
-        print(f" Error cargando portfolio_analisis.json: {e}", flush=True)
-    
-    try:
-        with open('mercado_analisis.json', 'r', encoding='utf-8') as f:
-            market_data = json.load(f)
-            datos_completos['market'] = market_data.get('market', {})
-    except Exception as e:
-        print(f" Error cargando mercado_analisis.json: {e}", flush=True)
+    # Sin candidatos el análisis de mercado queda vacío
+    datos_completos['market'] = market_results if all_market_candidates else {}
     
     # Nota: Ya NO hay FASE 2B, todo se analiza en una sola pasada
     
@@ -477,11 +570,9 @@ def run_integrated_analysis(
     # FASE 3: RESUMEN EJECUTIVO
     # ==================================================================
     
-    print("\n" + "="*80, flush=True)
-    print(" FASE 3: Generando Resumen Ejecutivo", flush=True)
-    print("="*80, flush=True)
+    _seccion(" FASE 3: Generando Resumen Ejecutivo", final="")
     
-    datos_completos['executive_summary'] = generar_resumen_ejecutivo(datos_completos)
+    datos_completos['executive_summary'] = generar_resumen_ejecutivo(datos_completos, ts=inicio.isoformat())
     
     # ==================================================================
     # FASE 4: EXPORTAR JSON Y MD CONSOLIDADOS (ELIMINADO - NO NECESARIO)
@@ -499,33 +590,34 @@ def run_integrated_analysis(
     # RESUMEN FINAL
     # ==================================================================
     
-    print("\n" + "="*80, flush=True)
-    print(" ANÁLISIS INTEGRADO COMPLETADO", flush=True)
-    print("="*80 + "\n", flush=True)
+    _seccion(" ANÁLISIS INTEGRADO COMPLETADO")
     
     # Mostrar resumen en consola
     resumen = datos_completos['executive_summary']
     
-    print(" RESUMEN RÁPIDO:", flush=True)
-    print(f"\n🎯 Distribución de señales:", flush=True)
-    for signal, count in resumen['distribucion_senales'].items():
-        emoji = "🟢" if signal == "COMPRAR" else "🔴" if signal == "VENDER" else "🟡"
-        print(f"   {emoji} {signal}: {count}", flush=True)
-    
-    print(f"\n🚨 Alertas:", flush=True)
-    print(f"   Alta prioridad: {len(resumen['alertas_alta_prioridad'])}", flush=True)
-    print(f"   Media prioridad: {len(resumen['alertas_media_prioridad'])}", flush=True)
-    print(f"   Cambios abruptos: {len(resumen['cambios_abruptos'])}", flush=True)
-    
-    print(f"\n💡 Recomendaciones principales:", flush=True)
-    for rec in resumen['recomendaciones'][:3]:
-        print(f"   {rec['mensaje']}", flush=True)
-    
-    print("\n📁 Archivos generados:", flush=True)
-    print("      1. 📄 portfolio_analisis.json (métricas del portfolio)", flush=True)
-    print("      2. 📝 portfolio_informe.md (informe del portfolio)", flush=True)
-    print("      3. 📄 mercado_analisis.json (métricas del mercado)", flush=True)
-    print("      4. 📝 mercado_informe.md (informe del mercado)", flush=True)
+    # Las líneas del resumen se acumulan y se escriben con un único flush
+    lineas = [" RESUMEN RÁPIDO:", "\n🎯 Distribución de señales:"]
+    for senal, count in resumen['distribucion_senales'].items():
+        emoji = EMOJI_RECOMENDACION.get(senal, "🟡")
+        lineas.append(f"   {emoji} {senal}: {count}")
+    
+    lineas += [
+        "\n🚨 Alertas:",
+        f"   Alta prioridad: {len(resumen['alertas_alta_prioridad'])}",
+        f"   Media prioridad: {len(resumen['alertas_media_prioridad'])}",
+        f"   Cambios abruptos: {len(resumen['cambios_abruptos'])}",
+        "\n💡 Recomendaciones principales:"
+    ]
+    lineas += [f"   {rec['mensaje']}" for rec in resumen['recomendaciones'][:3]]
+    
+    lineas += [
+        "\n📁 Archivos generados:",
+        "      1. 📄 portfolio_analisis.json (métricas del portfolio)",
+        "      2. 📝 portfolio_informe.md (informe del portfolio)",
+        "      3. 📄 mercado_analisis.json (métricas del mercado)",
+        "      4. 📝 mercado_informe.md (informe del mercado)"
+    ]
+    print("\n".join(lineas), flush=True)
     # print("\n   📈 ARCHIVOS ADICIONALES:", flush=True)
     # print("      - chart_*.html (gráficos interactivos)", flush=True)
     # print("      - chart_*.png (gráficos exportados)", flush=True)
@@ -567,9 +659,9 @@ def generar_informe_markdown_completo(datos: Dict):
         # Distribución de señales
         f.write("### Distribución de Señales\n\n")
         senales = resumen.get('distribucion_senales', {})
-        for signal, count in senales.items():
-            emoji = "🟢" if signal == "COMPRAR" else "🔴" if signal == "VENDER" else "🟡"
-            f.write(f"- {emoji} **{signal}**: {count}\n")
+        for senal, count in senales.items():
+            emoji = "🟢" if senal == "COMPRAR" else "🔴" if senal == "VENDER" else "🟡"
+            f.write(f"- {emoji} **{senal}**: {count}\n")
         
         # ====================================================================
         # ANOMALÍAS DETECTADAS (NUEVO V4.0)
@@ -829,24 +921,28 @@ def generar_informe_markdown_completo(datos: Dict):
 
 def limpiar_archivos_csv():
     """
-    Limpia (elimina) todos los archivos CSV generados por los radares
-    al final de cada ciclo de análisis
+    Limpia (elimina) todos los archivos CSV (y Parquet) generados por los
+    radares al final de cada ciclo de análisis
     """
-    import glob
-    
-    csv_files = glob.glob('c:/Users/mikia/analisis-tecnico/radar_*.csv')
+    # Un solo recorrido del directorio: scandir ya trae el nombre de cada
+    # entrada, sin el emparejamiento de glob ni rutas intermedias
+    try:
+        with os.scandir(RADAR_DIR) as entradas:
+            csv_files = [e for e in entradas
+                         if e.name.startswith('radar_') and e.name.endswith(('.csv', '.parquet'))]
+    except OSError:
+        csv_files = []
     
     if csv_files:
-        print("\n🧹 Limpiando archivos CSV...", flush=True)
-        for csv_file in csv_files:
+        print("\n🧹 Limpiando archivos CSV...")
+        for entrada in csv_files:
             try:
-                os.remove(csv_file)
-                filename = os.path.basename(csv_file)
-                print(f"   ✅ Eliminado: {filename}", flush=True)
+                os.remove(entrada.path)
+                print(f"   ✅ Eliminado: {entrada.name}")
             except Exception as e:
-                print(f"   ⚠️ Error eliminando {csv_file}: {e}", flush=True)
+                print(f"   ⚠️ Error eliminando {entrada.path}: {e}")
     else:
-        print("\n🧹 No se encontraron archivos CSV para limpiar", flush=True)
+        print("\n🧹 No se encontraron archivos CSV para limpiar")
 
 
 def main():
@@ -880,20 +976,26 @@ def main():
 
     intervalo_segundos = intervalo_minutos * 60
 
-    print("🚀 Iniciando modo de análisis continuo...", flush=True)
-    print("   - Portfolio único (stocks + crypto) + Radar S&P 500", flush=True)
-    print("   - Análisis de mercado (candidatos S&P 500 + candidatos crypto)", flush=True)
-    print("   - Resumen ejecutivo con alertas avanzadas", flush=True)
-    print(f"   - Intervalo entre ejecuciones: {intervalo_minutos} minutos\n", flush=True)
+    print("🚀 Iniciando modo de análisis continuo...\n"
+          "   - Portfolio único (stocks + crypto) + Radar S&P 500\n"
+          "   - Análisis de mercado (candidatos S&P 500 + candidatos crypto)\n"
+          "   - Resumen ejecutivo con alertas avanzadas\n"
+          f"   - Intervalo entre ejecuciones: {intervalo_minutos} minutos\n")
+
+    # SIGTERM (p. ej. al detener el contenedor) termina el bucle limpiamente:
+    # el ciclo en curso acaba y la espera entre ciclos se corta al instante.
+    # Ctrl+C sigue lanzando KeyboardInterrupt en cualquier punto
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
 
     ciclo = 1
 
     try:
-        while True:
-            inicio_ciclo = datetime.now()
-            print("=" * 80, flush=True)
-            print(f"🔁 Ciclo #{ciclo} - Inicio: {inicio_ciclo.strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
-            print("=" * 80, flush=True)
+        while not detener.is_set():
+            inicio_ciclo = datetime.now()  # Solo para mostrar la hora de inicio
+            t0 = time.monotonic()           # Duración inmune a ajustes del reloj
+            # Sin flush: la primera cabecera del análisis vacía el buffer
+            print(f"{_BANNER}\n🔁 Ciclo #{ciclo} - Inicio: {inicio_ciclo.strftime('%Y-%m-%d %H:%M:%S')}\n{_BANNER}")
 
             try:
                 run_integrated_analysis(
@@ -909,17 +1011,27 @@ def main():
                 # Limpiar archivos CSV al final del ciclo
                 limpiar_archivos_csv()
                 
-                fin_ciclo = datetime.now()
-                duracion = (fin_ciclo - inicio_ciclo).total_seconds() / 60
-                print(f"\n Ciclo #{ciclo} completado en {duracion:.2f} minutos", flush=True)
+                duracion = (time.monotonic() - t0) / 60
+                print(f"\n Ciclo #{ciclo} completado en {duracion:.2f} minutos")
             except Exception as e:
                 print(f"\n❌ Error durante el ciclo #{ciclo}: {e}", flush=True)
+                import traceback  # Solo se necesita al fallar un ciclo
                 traceback.print_exc()
 
             ciclo += 1
 
+            # Único flush del final del ciclo (limpieza, duración y espera)
             print(f"\n⏱️ Esperando {intervalo_minutos} minutos para la próxima ejecución. Presiona Ctrl+C para detener.", flush=True)
-            time.sleep(intervalo_segundos)
+            if sys.platform == 'win32':
+                # En Windows una espera sobre un lock no atiende Ctrl+C: tramos de 1 s
+                fin_espera = time.monotonic() + intervalo_segundos
+                while not detener.wait(min(1.0, max(0.0, fin_espera - time.monotonic()))):
+                    if time.monotonic() >= fin_espera:
+                        break
+            else:
+                detener.wait(intervalo_segundos)
+
+        print("\n🛑 Señal de parada recibida. Ejecución continua finalizada.", flush=True)
 
     except KeyboardInterrupt:
         print("\n🛑 Ejecución continua detenida por el usuario. Hasta la próxima!", flush=True)
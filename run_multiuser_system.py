@@ -8,7 +8,6 @@ Fecha: 27 de octubre de 2025
 """
 
 import os
-import sys
 import time
 import json
 import traceback
@@ -105,12 +104,11 @@ def is_market_day(
         return False
 
     return True
-if sys.platform == 'win32':
-    import codecs
-    if hasattr(sys.stdout, 'buffer'):
-        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    if hasattr(sys.stderr, 'buffer'):
-        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+
+# Configurar encoding UTF-8 para stdout (Windows compatibility)
+from _consola import configurar_utf8
+configurar_utf8()
 
 # Importar módulos del sistema
 from svga_system import SVGASystem
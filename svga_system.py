@@ -14,7 +14,11 @@ import plotly.io as pio
 from plotly.subplots import make_subplots
 import json
 import time
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import warnings
 import pytz
@@ -28,6 +32,141 @@ except ImportError:
     MARKET_CALENDAR_AVAILABLE = False
     print("⚠️ pandas-market-calendars no disponible. Verificación de días hábiles limitada.")
 
+# Buffer de escritura de los informes (128 KiB en vez de los 8 KiB por defecto):
+# json.dump emite cientos de fragmentos pequeños y así llegan al disco en
+# pocas llamadas al sistema
+BUFFER_ESCRITURA = 1 << 17
+
+# Emojis de los informes: una consulta al diccionario por activo/alerta
+EMOJI_RECOMENDACION = {"COMPRAR": "🟢", "VENDER": "🔴"}  # Resto: 🟡
+EMOJI_PRIORIDAD = {"HIGH": "🔴", "MEDIUM": "🟡"}        # Resto: ⚪
+
+# Directorio de los archivos exportados por export_results: el del propio
+# módulo, como RADAR_DIR en run_integrated_system (válido en Windows y Linux)
+DIRECTORIO_EXPORTACION = Path(__file__).resolve().parent
+
+# Huella del último contenido exportado por sección ('portfolio' / 'market')
+_HUELLAS_EXPORTADAS: Dict[str, bytes] = {}
+
+
+# Versión del cálculo de indicadores: al cambiar calculate_indicators se sube
+# y las entradas de _INDICADORES_CALCULADOS de ciclos anteriores dejan de valer
+VERSION_INDICADORES = 1
+
+# (ticker, intervalo) -> (huella del OHLCV, DataFrame con indicadores) de
+# los últimos cálculos; SVGASystem se crea en cada ciclo, la caché vive en el
+# módulo. LRU acotada: los candidatos de mercado rotan y el proceso corre 24/7.
+# El lock la protege del análisis multiusuario, que ejecuta SVGASystem en hilos
+MAX_INDICADORES_CALCULADOS = 128
+_INDICADORES_CALCULADOS: Dict[Tuple[str, str], Tuple[bytes, pd.DataFrame]] = OrderedDict()
+_LOCK_INDICADORES = threading.Lock()
+
+
+def _huella_ohlcv(df: pd.DataFrame) -> bytes:
+    """
+    Huella BLAKE2b de las barras descargadas (índice, columnas y valores)
+    
+    La marca de la última barra no basta: la vela diaria en curso conserva
+    su fecha mientras cambian sus precios, y yfinance revisa precios
+    pasados al ajustar dividendos.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{VERSION_INDICADORES}|{'|'.join(map(str, df.columns))}".encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.digest()
+
+
+def _huella_resultados(resultados: Dict) -> bytes:
+    """
+    Huella BLAKE2b del contenido de un análisis, sin su marca de tiempo
+    
+    Se serializa con el codificador C de json (sin indent), mucho más
+    barato que el volcado indentado que se evita cuando nada cambió.
+    """
+    contenido = {k: v for k, v in resultados.items() if k != "analysis_timestamp"}
+    payload = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+
+def _lineas_alertas(alerts: List[Dict]) -> str:
+    """Lista Markdown de alertas de un activo, construida con un único join"""
+    return "".join([
+        f"- {EMOJI_PRIORIDAD.get(alert['priority'], '⚪')} **{alert['type']}:** {alert['description']}\n"
+        for alert in alerts
+    ])
+
+
+# Cuerpo de la ficha de un activo en cada informe; _bloque_activo antepone
+# el encabezado y añade las alertas y el enlace al gráfico
+PLANTILLA_ACTIVO_PORTFOLIO = """**Recomendación:** **{recomendacion}** (Prioridad: {prioridad})  
+**Precio Actual:** ${precio:.2f}  
+**Régimen de Mercado:** {regimen}  
+**Tendencia Largo Plazo:** {tendencia}
+
+#### 🚨 Alertas Detectadas:
+
+"""
+PLANTILLA_ACTIVO_MERCADO = """**Recomendación:** {recomendacion}  
+**Tendencia:** {tendencia}  
+**Régimen:** {regimen}  
+**Precio:** ${precio:.2f}
+
+#### 🚨 Alertas:
+
+"""
+
+
+def _bloque_activo(partes: List[str], ticker: str, data: Dict, plantilla: str,
+                   icono_error: str = "⚠️") -> bool:
+    """
+    Añade a `partes` la ficha Markdown de un activo del portfolio o del mercado
+    
+    Args:
+        partes: Lista de piezas del informe (se unen al final con un join)
+        ticker: Símbolo del activo
+        data: Resultado del análisis del activo
+        plantilla: PLANTILLA_ACTIVO_PORTFOLIO o PLANTILLA_ACTIVO_MERCADO
+        icono_error: Icono del encabezado si el análisis falló
+    
+    Returns:
+        False si el activo tenía error (solo se añade el error), True si no
+    """
+    if "error" in data:
+        partes.append(f"### {icono_error} {ticker}\n**Error:** {data['error']}\n\n")
+        return False
+    
+    signals = data["signals"]
+    filters = signals["filters"]
+    recommendation = signals["recommendation"]
+    partes.append(f"### {EMOJI_RECOMENDACION.get(recommendation, '🟡')} {ticker}\n\n")
+    partes.append(plantilla.format(
+        recomendacion=recommendation,
+        prioridad=signals.get("priority"),
+        precio=signals["price_current"],
+        regimen=filters["market_regime"],
+        tendencia=filters["long_term_trend"]
+    ))
+    partes.append(_lineas_alertas(signals["alerts"]))
+    partes.append(f"\n📈 [Ver gráfico interactivo]({data['chart_file']})\n\n---\n\n")
+    return True
+
+
+# Columnas de pandas-ta exportadas en latest_metrics (columna -> nombre)
+INDICADORES_METRICAS = {
+    'EMA_12': 'ema_12',
+    'EMA_26': 'ema_26',
+    'EMA_50': 'ema_50',
+    'EMA_200': 'ema_200',
+    'RSI_14': 'rsi',
+    'MACD_12_26_9': 'macd',
+    'MACDh_12_26_9': 'macd_histogram',
+    'ADX_14': 'adx',
+    'OBV': 'obv',
+    'ATR_14': 'atr',
+    'BBL_20_2.0': 'bollinger_lower',
+    'BBU_20_2.0': 'bollinger_upper'
+}
+
 
 class SVGASystem:
     """Sistema de Vigilancia y Generación de Alertas Algorítmicas"""
@@ -45,6 +184,7 @@ class SVGASystem:
         self.data = {}
         self.signals = {}
         self.metrics = {}
+        self._precarga = {}  # (ticker, period, interval) -> OHLCV descargado en bloque
     
     @staticmethod
     def get_last_trading_date() -> datetime.date:
@@ -128,6 +268,44 @@ class SVGASystem:
         else:
             return False, f"Datos desfasados: última fecha es {last_data_date}, esperado {expected_trading_date} (desfase: {days_diff} días)"
         
+    def precargar_datos(self, tickers: List[str], period: str, interval: str):
+        """
+        Descarga en una sola petición el histórico de varios tickers
+        
+        yf.download con group_by='ticker' y threads=True resuelve todos los
+        tickers a la vez en lugar de uno tras otro. download_data usa estos
+        datos en su primer intento (con las mismas validaciones) y solo
+        vuelve a la red si faltan o no son válidos.
+        
+        Args:
+            tickers: Símbolos a precargar
+            period: Período de datos (debe coincidir con el de download_data)
+            interval: Intervalo de datos (debe coincidir con el de download_data)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if len(tickers) < 2:
+            return
+        
+        try:
+            datos = yf.download(tickers, period=period, interval=interval, group_by='ticker',
+                                threads=True, progress=False, timeout=15)
+        except Exception as e:
+            print(f"⚠️ Precarga en bloque fallida ({e}); se descargará ticker a ticker")
+            return
+        
+        if datos is None or datos.empty:
+            return
+        
+        disponibles = set(datos.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in disponibles:
+                # La unión de fechas deja filas vacías (p. ej. fines de semana en acciones)
+                df = datos[ticker].dropna(how='all')
+                if not df.empty:
+                    self._precarga[(ticker, period, interval)] = df
+        
+        print(f"📦 Precargados {len(self._precarga)}/{len(tickers)} activos ({period}, {interval})")
+    
     def download_data(self, ticker: str, period: str = "1y", interval: str = "1d", max_retries: int = 3) -> pd.DataFrame:
         """
         Descarga datos OHLCV de yfinance con reintentos y estrategias de fallback
@@ -166,8 +344,10 @@ class SVGASystem:
                     elif attempt > 0:
                         print(f"   🔄 Reintento {attempt + 1}/{max_retries}...")
                     
-                    # Descargar con timeout
-                    df = yf.download(ticker, period=p, interval=i, progress=False, timeout=15)
+                    # Datos precargados en bloque (solo en el primer intento) o descarga con timeout
+                    df = self._precarga.pop((ticker, p, i), None) if attempt == 0 else None
+                    if df is None:
+                        df = yf.download(ticker, period=p, interval=i, progress=False, timeout=15)
                     
                     # Verificar que el DataFrame no esté vacío
                     if df is None or df.empty:
@@ -320,6 +500,42 @@ class SVGASystem:
         
         return df
     
+    def calcular_indicadores_en_cache(self, df: pd.DataFrame, ticker: str, interval: str) -> pd.DataFrame:
+        """
+        calculate_indicators reutilizando el resultado de un ciclo anterior
+        si las barras descargadas del activo no cambiaron (fines de semana,
+        mercado cerrado, horas sin operaciones en cripto)
+        
+        Args:
+            df: DataFrame OHLCV devuelto por download_data
+            ticker: Símbolo del activo
+            interval: Intervalo de las barras (1d, 1wk)
+        
+        Returns:
+            DataFrame con indicadores, propio del llamador (la caché guarda
+            su propia copia)
+        """
+        clave = (ticker, interval)
+        huella = _huella_ohlcv(df)
+        with _LOCK_INDICADORES:
+            previo = _INDICADORES_CALCULADOS.get(clave)
+            if previo is not None and previo[0] == huella:
+                _INDICADORES_CALCULADOS.move_to_end(clave)
+                reutilizado = previo[1].copy()
+            else:
+                reutilizado = None
+        if reutilizado is not None:
+            print(f"♻️ {ticker}: sin barras nuevas, se reutilizan los indicadores del ciclo anterior")
+            return reutilizado
+        
+        df = self.calculate_indicators(df)
+        with _LOCK_INDICADORES:
+            _INDICADORES_CALCULADOS[clave] = (huella, df.copy())
+            _INDICADORES_CALCULADOS.move_to_end(clave)
+            while len(_INDICADORES_CALCULADOS) > MAX_INDICADORES_CALCULADOS:
+                _INDICADORES_CALCULADOS.popitem(last=False)
+        return df
+    
     def _calculate_fibonacci_levels(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calcula niveles de retroceso de Fibonacci basados en swing high/low reciente
@@ -726,11 +942,13 @@ class SVGASystem:
             "assets": {}
         }
         
+        self.precargar_datos(self.portfolio_tickers, period="1y", interval="1d")
+        
         for ticker in self.portfolio_tickers:
             try:
                 # Descargar y procesar datos
                 df = self.download_data(ticker, period="1y", interval="1d")
-                df = self.calculate_indicators(df)
+                df = self.calcular_indicadores_en_cache(df, ticker, "1d")
                 
                 # Generar señales
                 signals = self.generate_signals(df, ticker)
@@ -773,16 +991,23 @@ class SVGASystem:
     
     def analyze_market(self) -> Dict:
         """Analiza el mercado general para contexto macro"""
-        print("\n" + "="*80)
-        print(" ANÁLISIS DEL MERCADO GENERAL")
-        print("="*80 + "\n")
-        
         market_results = {
             "analysis_timestamp": datetime.now().isoformat(),
             "market_indicators": self.market_tickers,
             "assets": {}
         }
         
+        # Sin activos de mercado no hay nada que descargar ni resumir
+        if not self.market_tickers:
+            print("ℹ️ Sin activos de mercado: se omite el análisis del mercado\n")
+            return market_results
+        
+        print("\n" + "="*80)
+        print(" ANÁLISIS DEL MERCADO GENERAL")
+        print("="*80 + "\n")
+        
+        self.precargar_datos(self.market_tickers, period="2y", interval="1wk")
+        
         successful = 0
         failed = 0
         failed_tickers = []
@@ -795,7 +1020,7 @@ class SVGASystem:
             try:
                 # Descargar datos
                 df = self.download_data(ticker, period="2y", interval="1wk")  # Semanal para perspectiva macro
-                df = self.calculate_indicators(df)
+                df = self.calcular_indicadores_en_cache(df, ticker, "1wk")
                 
                 # Generar señales
                 signals = self.generate_signals(df, ticker)
@@ -853,31 +1078,18 @@ class SVGASystem:
     
     def _extract_latest_metrics(self, df: pd.DataFrame) -> Dict:
         """Extrae las métricas más recientes del DataFrame"""
-        latest = df.iloc[-1]
+        # La última fila como dict: cada consulta es un hash, no un acceso a Series
+        latest = df.iloc[-1].to_dict()
         metrics = {
             "price": float(latest['close']),
             "volume": float(latest['volume']),
         }
         
         # Agregar indicadores disponibles
-        indicators = {
-            'EMA_12': 'ema_12',
-            'EMA_26': 'ema_26',
-            'EMA_50': 'ema_50',
-            'EMA_200': 'ema_200',
-            'RSI_14': 'rsi',
-            'MACD_12_26_9': 'macd',
-            'MACDh_12_26_9': 'macd_histogram',
-            'ADX_14': 'adx',
-            'OBV': 'obv',
-            'ATR_14': 'atr',
-            'BBL_20_2.0': 'bollinger_lower',
-            'BBU_20_2.0': 'bollinger_upper'
-        }
-        
-        for col, name in indicators.items():
-            if col in latest.index and not pd.isna(latest[col]):
-                metrics[name] = float(latest[col])
+        for col, name in INDICADORES_METRICAS.items():
+            value = latest.get(col)
+            if value is not None and not pd.isna(value):
+                metrics[name] = float(value)
         
         return metrics
     
@@ -887,7 +1099,8 @@ class SVGASystem:
         """
         print("\n Generando informe ejecutivo...\n")
         
-        report = f"""#  INFORME EJECUTIVO - SISTEMA SVGA
+        # Las piezas se acumulan en una lista y se unen una sola vez al final
+        partes = [f"""#  INFORME EJECUTIVO - SISTEMA SVGA
 
 **Fecha y Hora de Análisis:** {datetime.now().strftime('%d de %B de %Y, %H:%M:%S')}
 
@@ -895,58 +1108,32 @@ class SVGASystem:
 
 ##  RESUMEN EJECUTIVO DEL PORTAFOLIO
 
-"""
+"""]
         
         # Análisis del portafolio
         for ticker, data in portfolio_results["assets"].items():
-            if "error" in data:
-                report += f"###  {ticker}\n**Error:** {data['error']}\n\n"
-                continue
-            
-            signals = data["signals"]
-            recommendation = signals["recommendation"]
-            priority = signals["priority"]
-            
-            # Emoji según recomendación
-            emoji = "🟢" if recommendation == "COMPRAR" else "🔴" if recommendation == "VENDER" else "🟡"
-            
-            report += f"""### {emoji} {ticker}
-
-**Recomendación:** **{recommendation}** (Prioridad: {priority})  
-**Precio Actual:** ${signals['price_current']:.2f}  
-**Régimen de Mercado:** {signals['filters']['market_regime']}  
-**Tendencia Largo Plazo:** {signals['filters']['long_term_trend']}
-
-#### 🚨 Alertas Detectadas:
-
-"""
-            
-            for alert in signals["alerts"]:
-                priority_emoji = "🔴" if alert["priority"] == "HIGH" else "🟡" if alert["priority"] == "MEDIUM" else "⚪"
-                report += f"- {priority_emoji} **{alert['type']}:** {alert['description']}\n"
-            
-            report += f"\n📈 [Ver gráfico interactivo]({data['chart_file']})\n\n---\n\n"
+            _bloque_activo(partes, ticker, data, PLANTILLA_ACTIVO_PORTFOLIO, icono_error="")
         
         # Análisis de mercado general
-        report += """##  CONTEXTO DE MERCADO GENERAL
+        partes.append("""##  CONTEXTO DE MERCADO GENERAL
 
-"""
+""")
         
         for ticker, data in market_results["assets"].items():
             if "error" in data:
                 continue
             
             signals = data["signals"]
-            report += f"""### {ticker}
+            partes.append(f"""### {ticker}
 
 **Tendencia:** {signals['filters']['long_term_trend']}  
 **Régimen:** {signals['filters']['market_regime']}  
 **Precio:** ${signals['price_current']:.2f}
 
-"""
+""")
         
         # Métricas clave
-        report += """---
+        partes.append("""---
 
 ##  MÉTRICAS TÉCNICAS CLAVE
 
@@ -981,15 +1168,16 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
 
 *Generado por AIDA (Artificial Intelligence Data Architect)*  
 *Sistema SVGA v1.0*
-"""
+""")
         
-        return report
+        return "".join(partes)
     
     def generate_portfolio_report(self, portfolio_results: Dict) -> str:
         """
         Genera informe ejecutivo SOLO del Portfolio en formato Markdown
         """
-        report = f"""# 📊 INFORME DE PORTFOLIO - SISTEMA SVGA
+        # Las piezas se acumulan en una lista y se unen una sola vez al final
+        partes = [f"""# 📊 INFORME DE PORTFOLIO - SISTEMA SVGA
 
 **Fecha y Hora de Análisis:** {datetime.now().strftime('%d de %B de %Y, %H:%M:%S')}
 
@@ -997,40 +1185,14 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
 
 ## 💼 ANÁLISIS DEL PORTAFOLIO
 
-"""
+"""]
         
         # Análisis del portafolio
         for ticker, data in portfolio_results["assets"].items():
-            if "error" in data:
-                report += f"### ⚠️ {ticker}\n**Error:** {data['error']}\n\n"
-                continue
-            
-            signals = data["signals"]
-            recommendation = signals["recommendation"]
-            priority = signals["priority"]
-            
-            # Emoji según recomendación
-            emoji = "🟢" if recommendation == "COMPRAR" else "🔴" if recommendation == "VENDER" else "🟡"
-            
-            report += f"""### {emoji} {ticker}
-
-**Recomendación:** **{recommendation}** (Prioridad: {priority})  
-**Precio Actual:** ${signals['price_current']:.2f}  
-**Régimen de Mercado:** {signals['filters']['market_regime']}  
-**Tendencia Largo Plazo:** {signals['filters']['long_term_trend']}
-
-#### 🚨 Alertas Detectadas:
-
-"""
-            
-            for alert in signals["alerts"]:
-                priority_emoji = "🔴" if alert["priority"] == "HIGH" else "🟡" if alert["priority"] == "MEDIUM" else "⚪"
-                report += f"- {priority_emoji} **{alert['type']}:** {alert['description']}\n"
-            
-            report += f"\n📈 [Ver gráfico interactivo]({data['chart_file']})\n\n---\n\n"
+            _bloque_activo(partes, ticker, data, PLANTILLA_ACTIVO_PORTFOLIO)
         
         # Métricas clave
-        report += """---
+        partes.append("""---
 
 ## 📊 MÉTRICAS TÉCNICAS CLAVE
 
@@ -1065,15 +1227,16 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
 
 *Generado por AIDA (Artificial Intelligence Data Architect)*  
 *Sistema SVGA v1.0*
-"""
+""")
         
-        return report
+        return "".join(partes)
     
     def generate_market_report(self, market_results: Dict) -> str:
         """
         Genera informe ejecutivo SOLO del Mercado en formato Markdown
         """
-        report = f"""# 🌍 INFORME DE MERCADO - SISTEMA SVGA
+        # Las piezas se acumulan en una lista y se unen una sola vez al final
+        partes = [f"""# 🌍 INFORME DE MERCADO - SISTEMA SVGA
 
 **Fecha y Hora de Análisis:** {datetime.now().strftime('%d de %B de %Y, %H:%M:%S')}
 
@@ -1081,7 +1244,7 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
 
 ## 📈 CONTEXTO DE MERCADO GENERAL
 
-"""
+"""]
         
         # Contadores para validación
         total_assets = len(market_results.get("assets", {}))
@@ -1089,34 +1252,8 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
         
         # Análisis de mercado general
         for ticker, data in market_results["assets"].items():
-            if "error" in data:
-                report += f"### ⚠️ {ticker}\n**Error:** {data['error']}\n\n"
-                continue
-            
-            signals = data["signals"]
-            recommendation = signals["recommendation"]
-            
-            # Emoji según recomendación
-            emoji = "🟢" if recommendation == "COMPRAR" else "🔴" if recommendation == "VENDER" else "🟡"
-            
-            report += f"""### {emoji} {ticker}
-
-**Recomendación:** {recommendation}  
-**Tendencia:** {signals['filters']['long_term_trend']}  
-**Régimen:** {signals['filters']['market_regime']}  
-**Precio:** ${signals['price_current']:.2f}
-
-#### 🚨 Alertas:
-
-"""
-            
-            for alert in signals["alerts"]:
-                priority_emoji = "🔴" if alert["priority"] == "HIGH" else "🟡" if alert["priority"] == "MEDIUM" else "⚪"
-                report += f"- {priority_emoji} **{alert['type']}:** {alert['description']}\n"
-            
-            report += f"\n📈 [Ver gráfico interactivo]({data['chart_file']})\n\n---\n\n"
-            
-            assets_processed += 1
+            if _bloque_activo(partes, ticker, data, PLANTILLA_ACTIVO_MERCADO):
+                assets_processed += 1
         
         # Validación final
         if assets_processed < total_assets:
@@ -1126,7 +1263,7 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
             print(f"✅ Informe de mercado generado correctamente: {assets_processed} activos procesados")
         
         # Métricas clave
-        report += """---
+        partes.append("""---
 
 ## 📊 MÉTRICAS TÉCNICAS CLAVE
 
@@ -1157,14 +1294,36 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
 
 *Generado por AIDA (Artificial Intelligence Data Architect)*  
 *Sistema SVGA v1.0*
-"""
+""")
         
-        return report
+        return "".join(partes)
     
     def export_results(self, portfolio_results: Dict, market_results: Dict):
         """
         Exporta resultados en JSON y Markdown (modo local - deprecado para multi-usuario)
+        
+        Si el contenido de una sección (portfolio o mercado) es idéntico al de
+        la exportación anterior y sus archivos siguen en disco, no se
+        regeneran: conservan la fecha del último cambio real.
         """
+        # Secciones cuyo contenido cambió desde la última exportación
+        huellas = {
+            "portfolio": _huella_resultados(portfolio_results),
+            "market": _huella_resultados(market_results)
+        }
+        archivos = {
+            "portfolio": ("portfolio_analisis.json", "portfolio_informe.md"),
+            "market": ("mercado_analisis.json", "mercado_informe.md")
+        }
+        actualizar = {
+            seccion: _HUELLAS_EXPORTADAS.get(seccion) != huella or not all(
+                (DIRECTORIO_EXPORTACION / nombre).exists() for nombre in archivos[seccion])
+            for seccion, huella in huellas.items()
+        }
+        for seccion, nombres in archivos.items():
+            if not actualizar[seccion]:
+                print(f" ⏭️ Sin cambios: se conservan {nombres[0]} y {nombres[1]}")
+        
         # Exportar JSON
         json_data = {
             "portfolio": portfolio_results,
@@ -1181,42 +1340,51 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
         # ===================================================================
         
         # JSON de Portfolio
-        portfolio_json = {
-            "portfolio": json_data["portfolio"],
-            "metadata": json_data["metadata"]
-        }
-        portfolio_json_filename = "portfolio_analisis.json"
-        with open(f"c:/Users/mikia/analisis-tecnico/{portfolio_json_filename}", 'w', encoding='utf-8') as f:
-            json.dump(portfolio_json, f, indent=2, ensure_ascii=False)
-        print(f" ✅ JSON Portfolio: {portfolio_json_filename}")
+        if actualizar["portfolio"]:
+            portfolio_json = {
+                "portfolio": json_data["portfolio"],
+                "metadata": json_data["metadata"]
+            }
+            portfolio_json_filename = "portfolio_analisis.json"
+            with open(DIRECTORIO_EXPORTACION / portfolio_json_filename, 'w', encoding='utf-8', buffering=BUFFER_ESCRITURA) as f:
+                json.dump(portfolio_json, f, indent=2, ensure_ascii=False)
+            print(f" ✅ JSON Portfolio: {portfolio_json_filename}")
         
         # JSON de Mercado
-        market_json = {
-            "market": json_data["market"],
-            "metadata": json_data["metadata"]
-        }
-        market_json_filename = "mercado_analisis.json"
-        with open(f"c:/Users/mikia/analisis-tecnico/{market_json_filename}", 'w', encoding='utf-8') as f:
-            json.dump(market_json, f, indent=2, ensure_ascii=False)
-        print(f" ✅ JSON Mercado: {market_json_filename}")
+        if actualizar["market"]:
+            market_json = {
+                "market": json_data["market"],
+                "metadata": json_data["metadata"]
+            }
+            market_json_filename = "mercado_analisis.json"
+            with open(DIRECTORIO_EXPORTACION / market_json_filename, 'w', encoding='utf-8', buffering=BUFFER_ESCRITURA) as f:
+                json.dump(market_json, f, indent=2, ensure_ascii=False)
+            print(f" ✅ JSON Mercado: {market_json_filename}")
         
         # ===================================================================
         # EXPORTAR MARKDOWN SEPARADOS: Portfolio y Mercado
         # ===================================================================
+        # Cada informe ya es un único str: se codifica una vez y se escribe en
+        # binario, sin pasar por TextIOWrapper (saltos de línea \n en todo SO)
         
         # Informe de Portfolio
-        portfolio_report = self.generate_portfolio_report(portfolio_results)
-        portfolio_md_filename = "portfolio_informe.md"
-        with open(f"c:/Users/mikia/analisis-tecnico/{portfolio_md_filename}", 'w', encoding='utf-8') as f:
-            f.write(portfolio_report)
-        print(f" ✅ Informe Portfolio: {portfolio_md_filename}")
+        if actualizar["portfolio"]:
+            portfolio_report = self.generate_portfolio_report(portfolio_results)
+            portfolio_md_filename = "portfolio_informe.md"
+            with open(DIRECTORIO_EXPORTACION / portfolio_md_filename, 'wb', buffering=BUFFER_ESCRITURA) as f:
+                f.write(portfolio_report.encode('utf-8'))
+            print(f" ✅ Informe Portfolio: {portfolio_md_filename}")
         
         # Informe de Mercado
-        market_report = self.generate_market_report(market_results)
-        market_md_filename = "mercado_informe.md"
-        with open(f"c:/Users/mikia/analisis-tecnico/{market_md_filename}", 'w', encoding='utf-8') as f:
-            f.write(market_report)
-        print(f" ✅ Informe Mercado: {market_md_filename}")
+        if actualizar["market"]:
+            market_report = self.generate_market_report(market_results)
+            market_md_filename = "mercado_informe.md"
+            with open(DIRECTORIO_EXPORTACION / market_md_filename, 'wb', buffering=BUFFER_ESCRITURA) as f:
+                f.write(market_report.encode('utf-8'))
+            print(f" ✅ Informe Mercado: {market_md_filename}")
+        
+        # Solo tras escribir con éxito se da la sección por exportada
+        _HUELLAS_EXPORTADAS.update(huellas)
     
     def generate_results_in_memory(self, portfolio_results: Dict, market_results: Dict) -> Dict:
         """
@@ -1262,8 +1430,14 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
             "mercado_md": mercado_md
         }
     
-    def run(self):
-        """Ejecuta el análisis completo del sistema SVGA"""
+    def run(self) -> Tuple[Dict, Dict]:
+        """
+        Ejecuta el análisis completo del sistema SVGA
+        
+        Returns:
+            Tupla (portfolio_results, market_results) con los mismos datos
+            exportados a portfolio_analisis.json y mercado_analisis.json
+        """
         print("\n" + "="*80)
         print("🚀 SISTEMA SVGA - INICIO DE ANÁLISIS")
         print("="*80 + "\n")
@@ -1294,6 +1468,8 @@ Este análisis es generado automáticamente por el Sistema SVGA basado en princi
         # print("      - market_*.html (gráficos interactivos del mercado)")
         # print("      - market_*.png (gráficos exportados del mercado)")
         print("\n")
+        
+        return portfolio_results, market_results
     
     def run_in_memory(self) -> Dict:
         """
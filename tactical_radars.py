@@ -6,7 +6,6 @@ Fecha: 25 de octubre de 2025
 Version: 1.0
 """
 
-import sys
 import pandas as pd
 import numpy as np
 import pandas_ta as ta
@@ -17,13 +16,8 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Configurar encoding UTF-8 para stdout (Windows compatibility)
-if sys.platform == 'win32':
-    import codecs
-    # Solo reconfigurar si stdout tiene buffer (no es ya un TextIOWrapper)
-    if hasattr(sys.stdout, 'buffer'):
-        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    if hasattr(sys.stderr, 'buffer'):
-        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+from _consola import configurar_utf8
+configurar_utf8()
 
 
 class TacticalRadarSystem:
@@ -631,10 +625,10 @@ class TacticalRadarSystem:
         print(f"🏆 Total de candidatos: {len(all_candidates)}")
         print(f"\n🏆 Top {min(15, len(all_candidates))} candidatos:")
         
-        for i, (idx, row) in enumerate(all_candidates.head(15).iterrows(), 1):
-            print(f"   {i:2}. {row['ticker']:8} | Radar: {row['radar']:20} | "
-                  f"Score: {row['score']:5.1f} | Precio: ${row['precio']:8.2f} | "
-                  f"RSI: {row['rsi']:5.1f} | ADX: {row['adx']:5.1f}")
+        for i, row in enumerate(all_candidates.head(15).itertuples(index=False), 1):
+            print(f"   {i:2}. {row.ticker:8} | Radar: {row.radar:20} | "
+                  f"Score: {row.score:5.1f} | Precio: ${row.precio:8.2f} | "
+                  f"RSI: {row.rsi:5.1f} | ADX: {row.adx:5.1f}")
         
         candidates_list = all_candidates['ticker'].tolist()
         